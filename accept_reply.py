@@ -0,0 +1,106 @@
+"""
+Reading the server's reply to an accept (the request Confirm sends).
+
+classify_accept_response(status, body) gives one of:
+
+  "WON"       the job is ours
+  "TAKEN"     someone else got it first
+  "REVIEW"    the job is locked for now; try again
+  "ERROR: …"  anything else, including replies we can't read
+
+A false WON is the expensive mistake (the job is settled, a SECURED push
+goes out and the day is blocked), so a 2xx only counts as a win when its
+body is empty or positively says so. Only known JSON fields are looked at,
+never substrings of the raw body.
+
+    python check_accept_replies.py     # runs fake_smartfind.ACCEPT_REPLY_CASES
+"""
+import json
+
+# What a reply's "status"/"result" field says
+WON_STATUSES = frozenset(["accepted", "success", "succeeded", "ok", "confirmed", "assigned", "booked"])
+REVIEW_STATUSES = frozenset(["under_review", "review", "pending", "locked"])
+TAKEN_STATUSES = frozenset(["unavailable", "not_available", "no_longer_available", "taken", "filled",
+                            "already_taken", "already_filled"])
+FAILED_STATUSES = frozenset(["failed", "failure", "error", "denied", "rejected", "declined", "invalid",
+                             "unauthorized", "forbidden", "conflict"])
+# ...and the phrases its "message"/"error" text uses
+REVIEW_PHRASES = ("under review",)
+TAKEN_PHRASES = ("no longer available", "already been taken", "already been filled")
+# A reply that is really the login form: the session ran out mid-accept
+LOGIN_MARKERS = ("logoninitaction", 'id="userid"', "id='userid'", 'name="userid"')
+
+
+def _status_value(data):
+    for key in ("status", "result"):
+        value = data.get(key)
+        if isinstance(value, str) and value.strip():
+            return value.strip().lower().replace(" ", "_").replace("-", "_")
+    return None
+
+
+def _message_marker(data):
+    for key in ("message", "error"):
+        value = data.get(key)
+        if isinstance(value, str):
+            value = value.lower()
+            if any(phrase in value for phrase in REVIEW_PHRASES):
+                return "REVIEW"
+            if any(phrase in value for phrase in TAKEN_PHRASES):
+                return "TAKEN"
+    return None
+
+
+def _read(body):
+    """(data dict or None, error text or None) for a reply body."""
+    text = (body or "").strip()
+    if not text:
+        return {}, None
+    try:
+        data = json.loads(text)
+    except ValueError:
+        lowered = text.lower()
+        if any(marker in lowered for marker in LOGIN_MARKERS):
+            return None, "session expired (login page)"
+        return None, "reply is not JSON"
+    if not isinstance(data, dict):
+        return None, "reply is not a JSON object"
+    return data, None
+
+
+def classify_accept_response(status, body):
+    """"WON", "TAKEN", "REVIEW" or "ERROR: ..." for an accept reply's status code and body."""
+    if 200 <= status < 300 and not (body or "").strip():
+        return "WON"  # a bare 200/204 is how some endpoints say yes
+    data, problem = _read(body)
+    if data is None:
+        if 200 <= status < 300:
+            return f"ERROR: {problem}"
+        data = {}
+
+    value = _status_value(data)
+    marker = _message_marker(data)
+    if value in REVIEW_STATUSES:
+        return "REVIEW"
+    if value in TAKEN_STATUSES:
+        return "TAKEN"
+    if marker:
+        return marker
+
+    if not 200 <= status < 300:
+        if status == 423:
+            return "REVIEW"
+        if status in (404, 409, 410):
+            return "TAKEN"
+        return f"ERROR: HTTP {status}"
+
+    if data.get("success") is False:
+        return "ERROR: success is false"
+    error = data.get("error")
+    if error:
+        return f"ERROR: {error}"
+    if value in FAILED_STATUSES:
+        return f"ERROR: status {value}"
+    if value in WON_STATUSES or data.get("success") is True:
+        return "WON"
+    return "ERROR: reply does not say the job was accepted"
@@ -12,6 +12,7 @@ SF_USERNAME = os.getenv("SF_USERNAME")
 SF_PASSWORD = os.getenv("SF_PASSWORD")
 PUSHOVER_USER = os.getenv("PUSHOVER_USER")
 PUSHOVER_TOKEN = os.getenv("PUSHOVER_TOKEN")
+BASE_URL = os.getenv("SF_BASE_URL", "https://westcontracosta.eschoolsolutions.com")
 
 def send_push(message):
     try:
@@ -36,7 +37,7 @@ def run_alpha_bot():
         page = browser.new_page()
         
         print("🌐 Navigating...")
-        page.goto("https://westcontracosta.eschoolsolutions.com/logOnInitAction.do")
+        page.goto(f"{BASE_URL}/logOnInitAction.do")
         
         # --- STEP 1: LOGIN ---
         try:
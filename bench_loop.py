@@ -0,0 +1,152 @@
+"""
+End-to-end latency benchmark: runs loop_bot against the offline fake SmartFind.
+
+    python bench_loop.py --duration 300 --rate 2 --table-size 50 --interval 5
+
+Reports, for every job posted during the run:
+  posting -> detect   server posted it -> a scan first parsed its row
+  detect  -> click    row parsed -> Accept icon clicked
+  click   -> confirm  Accept icon clicked -> accept request reached the server
+plus Python and Chromium memory after each scan.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import check_accept_replies
+from fake_smartfind import FakeSmartFind
+from memory_watchdog import rss_mb, child_pids
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark loop_bot against the fake SmartFind")
+    parser.add_argument("--duration", type=float, default=120, help="seconds to run")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between scans")
+    parser.add_argument("--rate", type=float, default=2.0, help="new postings per minute")
+    parser.add_argument("--table-size", type=int, default=20)
+    parser.add_argument("--target-ratio", type=float, default=0.5)
+    parser.add_argument("--under-review", type=float, default=0.0)
+    parser.add_argument("--steal-after", type=float, default=90.0)
+    parser.add_argument("--mode", choices=["browser", "json", "watch"], default="browser")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--no-route-filter", action="store_true", help="load every resource (baseline)")
+    return parser.parse_args()
+
+
+# ==========================================
+# 📏 MEASUREMENT
+# ==========================================
+def summarize(label, values):
+    if not values:
+        print(f"  {label:<20} no samples")
+        return
+    values = sorted(values)
+    p90 = values[min(len(values) - 1, int(len(values) * 0.9))]
+    print(f"  {label:<20} n={len(values):<4} p50={statistics.median(values):7.2f}s "
+          f"p90={p90:7.2f}s max={values[-1]:7.2f}s")
+
+
+# ==========================================
+# 🚀 RUN
+# ==========================================
+def main():
+    args = parse_args()
+    fake = FakeSmartFind(rate_per_min=args.rate, table_size=args.table_size,
+                         target_ratio=args.target_ratio, under_review=args.under_review,
+                         steal_after=args.steal_after, seed=args.seed).start()
+    store_dir = tempfile.mkdtemp(prefix="bench-")
+
+    # loop_bot reads its settings at import time
+    os.environ.update({
+        "SF_BASE_URL": fake.url,
+        "SF_USERNAME": "bench",
+        "SF_PASSWORD": "bench",
+        "PUSHOVER_API": fake.url,
+        "PUSHOVER_TOKEN": "bench",
+        "PUSHOVER_USER": "bench",
+        "JOB_STORE_PATH": os.path.join(store_dir, "jobs.db"),
+        "SESSION_STATE_PATH": os.path.join(store_dir, "session.json"),
+        "POSTING_LOG_DIR": os.path.join(store_dir, "postings"),
+        "POLL_MODE": args.mode,
+        "PROFILES_PATH": "",  # just the one account, pointed at the fake
+        "ROUTE_FILTER": "0" if args.no_route_filter else "1",
+    })
+    import loop_bot
+    from job_store import make_job_key
+
+    if check_accept_replies.check():
+        raise SystemExit("❌ Accept replies are misread; see check_accept_replies.py")
+
+    detected = {}
+    parse_row_text = loop_bot.parse_row_text
+
+    def timed_parse(row_text):
+        result = parse_row_text(row_text)
+        if result[3] and result[3] not in detected:
+            detected[result[3]] = time.time()
+        return result
+
+    loop_bot.parse_row_text = timed_parse
+
+    account = loop_bot.load_accounts()[0]
+    started = time.time()
+    scan_times, py_mem, browser_mem = [], [], []
+    print(f"🧪 Benchmarking against {fake.url} for {args.duration:.0f}s ({args.mode} mode)...")
+    try:
+        while time.time() - started < args.duration:
+            tick = time.time()
+            loop_bot.run_check(account)
+            scan_times.append(time.time() - tick)
+            py_mem.append(rss_mb(os.getpid()))
+            browser_mem.append(sum(rss_mb(pid) for pid in child_pids(os.getpid())))
+            # Sleep on the bot's loop so watch mode keeps handling row events
+            loop_bot.get_loop().run_until_complete(asyncio.sleep(max(0.0, args.interval - (time.time() - tick))))
+    finally:
+        loop_bot.get_loop().run_until_complete(loop_bot.SESSION.close())
+        account.close()
+        jobs, events, pushes = fake.snapshot()
+        fake.stop()
+
+    clicks, confirms = {}, {}
+    for event in events:
+        bucket = clicks if event["type"] == "click" else confirms if event["type"] == "confirm" else None
+        if bucket is not None:
+            bucket.setdefault(event["id"], event["at"])
+
+    posting_to_detect, detect_to_click, click_to_confirm = [], [], []
+    posted = [job for job in jobs if job["posted_at"] >= started]
+    for job in posted:
+        key = make_job_key(job["date"], job["school"], job["start"], job["end"])
+        seen_at = detected.get(key)
+        if seen_at is None:
+            continue
+        posting_to_detect.append(seen_at - job["posted_at"])
+        if job["id"] in clicks:
+            detect_to_click.append(clicks[job["id"]] - seen_at)
+            if job["id"] in confirms:
+                click_to_confirm.append(confirms[job["id"]] - clicks[job["id"]])
+
+    won = sum(1 for job in posted if job["taken_by"] == "bot")
+    lost = sum(1 for job in posted if job["target"] and job["taken_by"] == "other")
+    print(f"\n📊 {len(scan_times)} scans, {len(posted)} postings "
+          f"({sum(j['target'] for j in posted)} target), won {won}, lost to others {lost}, "
+          f"{len(pushes)} pushes")
+    summarize("scan duration", scan_times)
+    summarize("posting -> detect", posting_to_detect)
+    summarize("detect -> click", detect_to_click)
+    summarize("click -> confirm", click_to_confirm)
+    if py_mem:
+        print(f"  {'python RSS':<20} last={py_mem[-1]:7.1f}MB max={max(py_mem):7.1f}MB")
+        print(f"  {'chromium RSS':<20} last={browser_mem[-1]:7.1f}MB max={max(browser_mem):7.1f}MB")
+    print(f"  {'request filter':<20} {loop_bot.REQUEST_FILTER.summary()}")
+    print("\n⏱️ Stage timings:\n" + loop_bot.METRICS.summary())
+    recycles = loop_bot.WATCHDOG.stats()
+    print(f"  {'recycles':<20} context={recycles['context_recycles']} browser={recycles['browser_recycles']} "
+          f"crashes={loop_bot.SESSION.crashes}")
+
+
+if __name__ == "__main__":
+    main()
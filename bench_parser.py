@@ -0,0 +1,86 @@
+"""
+Row parser check and microbenchmark. No browser needed.
+
+    python bench_parser.py --rounds 2000
+
+First every row in the fixture corpus is parsed and compared with what it
+should give; any mismatch is printed and the script exits non-zero. Then
+the corpus is parsed over and over, and rows/second is reported both cold
+(cache cleared before every round, so every row is parsed from scratch)
+and warm (memoized, as in a real scan where most rows were seen before).
+"""
+import argparse
+import json
+import sys
+import time
+
+import row_parser
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check and benchmark row_parser")
+    parser.add_argument("--corpus", default="fixtures/rows.jsonl")
+    parser.add_argument("--rounds", type=int, default=2000, help="passes over the corpus per timing")
+    return parser.parse_args()
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ==========================================
+# ✅ CHECK
+# ==========================================
+def check(corpus):
+    failures = 0
+    row_parser.clear_cache()
+    for case in corpus:
+        row = row_parser.parse_row(case["text"])
+        expect = case["expect"]
+        if row is None or expect is None:
+            ok = row is None and expect is None
+        else:
+            ok = (row.date, row.school, row.start, row.end) == (
+                expect["date"], expect["school"], expect["start"], expect["end"]
+            ) and abs(row.duration - expect["duration"]) < 1e-6
+        if not ok:
+            failures += 1
+            print(f"  ❌ {case['note']}: got {row!r}, expected {expect!r}")
+    return failures
+
+
+# ==========================================
+# ⏱️ BENCHMARK
+# ==========================================
+def rows_per_second(texts, rounds, cold):
+    parse_row = row_parser.parse_row
+    clear = row_parser.clear_cache
+    clear()
+    elapsed = 0.0
+    for _ in range(rounds):
+        if cold:
+            clear()
+        started = time.perf_counter()
+        for text in texts:
+            parse_row(text)
+        elapsed += time.perf_counter() - started
+    return len(texts) * rounds / elapsed
+
+
+def main():
+    args = parse_args()
+    corpus = load_corpus(args.corpus)
+    failures = check(corpus)
+    print(f"🧪 {len(corpus) - failures}/{len(corpus)} fixture rows parsed as expected")
+
+    texts = [case["text"] for case in corpus]
+    cold = rows_per_second(texts, args.rounds, cold=True)
+    warm = rows_per_second(texts, args.rounds, cold=False)
+    print(f"  cold  {cold:>12,.0f} rows/s  ({1e6 / cold:.2f}µs/row)")
+    print(f"  warm  {warm:>12,.0f} rows/s  ({1e6 / warm:.2f}µs/row)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Record and replay browser sessions.
+
+In "record" mode every browser context writes a HAR file of everything it
+loaded (login, views, accept requests) to the capture directory, and
+snapshot() saves the page's DOM at the interesting moments, so a live
+session can be studied offline afterwards.
+
+In "replay" mode a recorded HAR is served to the context in place of the
+network: nothing leaves the machine, and the whole scan pipeline runs
+against the captured pages as often (and as fast) as you like. Requests the
+capture doesn't have are aborted.
+
+HAR files hold the login form post and session cookies. Keep them private.
+"""
+import glob
+import os
+import time
+
+
+class Capture:
+    def __init__(self, mode="", directory="captures", replay_har=None):
+        if mode not in ("", "record", "replay"):
+            raise ValueError(f"unknown capture mode {mode!r}")
+        self.mode = mode
+        self.directory = directory
+        self.replay_har = replay_har
+        self.snapshots = 0
+
+    @property
+    def recording(self):
+        return self.mode == "record"
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def _stamp(self):
+        return time.strftime("%Y%m%d-%H%M%S")
+
+    def har_to_replay(self):
+        """REPLAY_HAR if given, else the newest .har in the capture directory."""
+        if self.replay_har:
+            return self.replay_har
+        captures = sorted(glob.glob(os.path.join(self.directory, "*.har")), key=os.path.getmtime)
+        if not captures:
+            raise FileNotFoundError(f"no .har captures in {self.directory}")
+        return captures[-1]
+
+    def context_options(self, name):
+        """Extra new_context() arguments: a fresh HAR file per context when recording."""
+        if not self.recording:
+            return {}
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{name}-{self._stamp()}.har")
+        print(f"   📼 Recording {name} browser traffic to {path}")
+        return {"record_har_path": path, "record_har_mode": "full"}
+
+    async def install(self, context):
+        """Points the context at the recorded HAR when replaying."""
+        if not self.replaying:
+            return
+        path = self.har_to_replay()
+        print(f"   📼 Replaying {path}")
+        await context.route_from_har(path, not_found="abort")
+
+    async def snapshot(self, page, label):
+        """Saves the page's current DOM when recording. Never raises."""
+        if not self.recording:
+            return
+        try:
+            folder = os.path.join(self.directory, "snapshots")
+            os.makedirs(folder, exist_ok=True)
+            self.snapshots += 1
+            path = os.path.join(folder, f"{self._stamp()}-{self.snapshots:05d}-{label}.html")
+            html = await page.content()
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(html)
+        except Exception as e:
+            print(f"   ⚠️ Snapshot {label} failed: {e}")
@@ -0,0 +1,34 @@
+"""
+Checks how accept replies are read. No browser or server needed.
+
+    python check_accept_replies.py
+
+Runs every (status, body, outcome) case in fake_smartfind.ACCEPT_REPLY_CASES
+through accept_reply.classify_accept_response, prints any mismatch and exits
+non-zero if there was one.
+"""
+import sys
+
+from accept_reply import classify_accept_response
+from fake_smartfind import ACCEPT_REPLY_CASES
+
+
+def check():
+    """Prints each case that reads wrong. Returns how many did."""
+    failures = 0
+    for status, body, outcome in ACCEPT_REPLY_CASES:
+        got = classify_accept_response(status, body)
+        if got != outcome:
+            failures += 1
+            print(f"  ❌ HTTP {status} {body!r}: got {got!r}, expected {outcome!r}")
+    return failures
+
+
+def main():
+    failures = check()
+    print(f"🧪 {len(ACCEPT_REPLY_CASES) - failures}/{len(ACCEPT_REPLY_CASES)} accept replies read as expected")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,448 @@
+"""
+Offline stand-in for the SmartFind substitute site.
+
+Serves everything loop_bot touches: the login form (#userId / #userPin),
+the SPA with its active and available job views and their JSON feeds, the
+Accept icon, the Confirm modal, the success banner, "Under Review" jobs,
+and a Pushover stand-in at /1/messages.json. New jobs are posted at a
+configurable rate, and a simulated competitor takes jobs the bot is too
+slow to grab.
+
+Run it on its own:
+
+    python fake_smartfind.py --port 8085 --rate 2 --table-size 40
+
+then point the bot at it with SF_BASE_URL=http://127.0.0.1:8085 and
+PUSHOVER_API=http://127.0.0.1:8085. bench_loop.py drives it automatically.
+"""
+import argparse
+import http.server
+import json
+import random
+import secrets
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timedelta
+
+TARGET_SCHOOLS = [
+    "EL CERRITO HIGH", "RICHMOND HIGH", "PINOLE VALLEY HIGH",
+    "KENNEDY HIGH", "DE ANZA HIGH", "HERCULES HIGH",
+]
+OTHER_SCHOOLS = [
+    "OHLONE ELEMENTARY", "MADERA ELEMENTARY", "LOVONYA DEJEAN MIDDLE",
+    "PORTOLA MIDDLE", "STEGE ELEMENTARY", "HELMS MIDDLE",
+]
+TITLES = ["English", "Math", "Science", "History", "PE", "Spanish"]
+SHIFTS = [("7:45 AM", "2:45 PM"), ("8:00 AM", "3:00 PM"), ("8:30 AM", "12:30 PM"), ("12:00 PM", "3:30 PM")]
+
+# What POST /api/substitute/jobs/<id>/accept answers
+ACCEPT_REPLIES = {
+    "won": (200, {"status": "accepted"}),
+    "taken": (409, {"status": "unavailable"}),
+    "review": (423, {"status": "under_review"}),
+}
+
+# Accept replies and how accept_reply.classify_accept_response must read them:
+# (status, body, outcome). check_accept_replies.py runs them; so does bench_loop.py.
+ACCEPT_REPLY_CASES = [
+    (200, '{"status": "accepted", "jobNumber": 17}', "WON"),
+    (200, '{"status": "accepted", "unavailableDates": [], "note": "already confirmed"}', "WON"),
+    (200, '{"status": "accepted", "message": "Job accepted. Other jobs that day are now unavailable."}', "WON"),
+    (200, '{"success": true, "jobNumber": 17}', "WON"),
+    (204, '', "WON"),
+    (200, '{"status": "Under Review"}', "REVIEW"),
+    (200, '{"status": "failed", "message": "This job is no longer available."}', "TAKEN"),
+    (200, '{"success": false, "message": "Unable to accept job"}', "ERROR: success is false"),
+    (200, '{"status": "failed", "message": "Error processing request"}', "ERROR: status failed"),
+    (200, '{"status": "denied"}', "ERROR: status denied"),
+    (200, '{"error": "Job conflicts with another assignment"}', "ERROR: Job conflicts with another assignment"),
+    (200, '{"jobNumber": 17}', "ERROR: reply does not say the job was accepted"),
+    (200, '{}', "ERROR: reply does not say the job was accepted"),
+    (200, '<html><form action="/logOnAction.do"><input id="userId"></form></html>',
+     "ERROR: session expired (login page)"),
+    (200, '<html><body>Your session has expired. <a href="/logOnInitAction.do">Log on</a></body></html>',
+     "ERROR: session expired (login page)"),
+    (200, '<html><body>Thanks</body></html>', "ERROR: reply is not JSON"),
+    (409, '{"status": "unavailable"}', "TAKEN"),
+    (410, '', "TAKEN"),
+    (423, '{"status": "under_review"}', "REVIEW"),
+    (400, '{"error": "This job is under review."}', "REVIEW"),
+    (500, '<html>Internal error</html>', "ERROR: HTTP 500"),
+]
+
+LOGIN_PAGE = """<!doctype html>
+<html><head><title>SmartFind Express - Log On</title></head>
+<body>
+<form method="post" action="/logOnAction.do">
+  <label>Access ID <input id="userId" name="userId"></label>
+  <label>PIN <input id="userPin" name="userPin" type="password"></label>
+  <button type="submit">Sign In</button>
+</form>
+</body></html>
+"""
+
+# SmartFind stacks each row's cells, so a row's innerText is one line per cell.
+APP_PAGE = """<!doctype html>
+<html><head><title>SmartFind Express</title>
+<style>
+  tr.job td { display: block; }
+  .accept-icon { display: inline-block; width: 16px; height: 16px; background: #2a7; cursor: pointer; }
+  #modal { position: fixed; top: 30%; left: 35%; background: #fff; border: 1px solid #333; padding: 24px; }
+  #banner { min-height: 1em; }
+</style></head>
+<body>
+<nav>
+  <a id="available-tab-link" href="#/substitute/jobs/available">Available Jobs</a>
+  <a id="active-tab-link" href="#/substitute/jobs/active">Active Jobs</a>
+  <button id="refresh">Refresh</button>
+</nav>
+<div id="banner"></div>
+<div id="view"></div>
+<div id="modal" hidden>
+  <p>Are you sure you want to accept this job?</p>
+  <button id="confirm">Confirm</button> <button id="cancel">Cancel</button>
+</div>
+<script>
+const view = document.getElementById("view");
+const banner = document.getElementById("banner");
+const modal = document.getElementById("modal");
+let jobs = {};
+let pendingId = null;
+
+function beacon(type, id) {
+  navigator.sendBeacon("/_bench/event", JSON.stringify({type: type, id: id}));
+}
+
+function routeName() {
+  return location.hash.includes("jobs/active") ? "active" : "available";
+}
+
+async function load() {
+  const name = routeName();
+  const response = await fetch("/api/substitute/jobs/" + name, {credentials: "same-origin"});
+  if (response.status === 401) { location.href = "/logOnInitAction.do"; return; }
+  const data = await response.json();
+  render(name, data.jobs);
+}
+
+function render(name, list) {
+  jobs = {};
+  if (!list.length) {
+    view.innerHTML = name === "available"
+      ? "<p>There are no jobs available at this time.</p>"
+      : "<p>You have no active jobs.</p>";
+    return;
+  }
+  const rows = list.map(job => {
+    jobs[job.id] = job;
+    const accept = name === "available"
+      ? `<td class="accept-cell"><i class="accept-icon"></i>Accept</td>` : "";
+    return `<tr class="job" data-job="${job.id}"><td>Details</td><td>${job.weekday}</td>` +
+      `<td>${job.date}</td><td>${job.start}</td><td>${job.end}</td>` +
+      `<td>${job.title}</td><td>${job.school}</td>${accept}</tr>`;
+  }).join("");
+  view.innerHTML = `<table><thead><tr><th>Date</th><th>Time</th><th>Location</th></tr></thead>` +
+    `<tbody>${rows}</tbody></table>`;
+}
+
+view.addEventListener("click", event => {
+  const cell = event.target.closest("td.accept-cell");
+  if (!cell) return;
+  const id = Number(cell.parentElement.dataset.job);
+  beacon("click", id);
+  if (jobs[id] && jobs[id].underReview) {
+    banner.textContent = "This job is Under Review. Please try again later.";
+    return;
+  }
+  pendingId = id;
+  modal.hidden = false;
+});
+
+document.getElementById("cancel").addEventListener("click", () => { modal.hidden = true; });
+
+document.getElementById("confirm").addEventListener("click", async () => {
+  const id = pendingId;
+  const response = await fetch(`/api/substitute/jobs/${id}/accept`, {method: "POST", credentials: "same-origin"});
+  const data = await response.json();
+  modal.hidden = true;
+  if (response.status === 200) {
+    banner.textContent = `Success! You have successfully accepted this job. Job Number: ${data.jobNumber}`;
+    const row = view.querySelector(`tr[data-job="${id}"]`);
+    if (row) row.remove();
+  } else if (response.status === 423) {
+    banner.textContent = "This job is Under Review. Please try again later.";
+  } else {
+    banner.textContent = "This job is no longer available.";
+  }
+});
+
+document.getElementById("refresh").addEventListener("click", load);
+window.addEventListener("hashchange", load);
+load();
+</script>
+</body></html>
+"""
+
+
+class FakeSmartFind:
+    def __init__(self, host="127.0.0.1", port=0, rate_per_min=1.0, table_size=20,
+                 target_ratio=0.5, under_review=0.0, review_seconds=5.0,
+                 steal_after=60.0, session_ttl=1800, seed=None):
+        self.rate_per_min = rate_per_min
+        self.table_size = table_size
+        self.target_ratio = target_ratio
+        self.under_review = under_review
+        self.review_seconds = review_seconds
+        self.steal_after = steal_after
+        self.session_ttl = session_ttl
+        self.random = random.Random(seed)
+
+        self.jobs = {}
+        self.sessions = {}
+        self.events = []
+        self.pushes = []
+        self.lock = threading.Lock()
+        self._next_id = 1000
+        self._stopping = threading.Event()
+
+        self.server = http.server.ThreadingHTTPServer((host, port), FakeHandler)
+        self.server.daemon_threads = True
+        self.server.fake = self
+        self._threads = []
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # ==========================================
+    # 🏁 LIFECYCLE
+    # ==========================================
+    def start(self):
+        for _ in range(self.table_size):
+            self.post_job(target=False, steal=False)
+        for target in (self.server.serve_forever, self._poster):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _poster(self):
+        while self.rate_per_min > 0:
+            delay = self.random.expovariate(self.rate_per_min / 60.0)
+            if self._stopping.wait(delay):
+                return
+            self.post_job()
+
+    # ==========================================
+    # 📋 JOBS
+    # ==========================================
+    def post_job(self, target=None, steal=True):
+        """Posts a new job and returns it. Target jobs always pass the bot's rules."""
+        if target is None:
+            target = self.random.random() < self.target_ratio
+        day = datetime.now() + timedelta(days=self.random.randint(2, 12))
+        while day.weekday() == 1:  # the bot never works Tuesdays
+            day += timedelta(days=1)
+        start, end = SHIFTS[self.random.randrange(2)] if target else self.random.choice(SHIFTS)
+        now = time.time()
+        with self.lock:
+            self._next_id += 1
+            job = {
+                "id": self._next_id,
+                "date": day.strftime("%m/%d/%Y"),
+                "weekday": day.strftime("%A"),
+                "start": start,
+                "end": end,
+                "title": self.random.choice(TITLES),
+                "school": self.random.choice(TARGET_SCHOOLS if target else OTHER_SCHOOLS),
+                "target": target,
+                "posted_at": now,
+                "review_until": now + self.review_seconds if self.random.random() < self.under_review else 0,
+                "steal_at": now + self.random.expovariate(1.0 / self.steal_after) if steal and self.steal_after else None,
+                "taken_by": None,
+                "taken_at": None,
+            }
+            self.jobs[job["id"]] = job
+        return job
+
+    def _settle(self, now):
+        # The competitor grabs anything whose time has come
+        for job in self.jobs.values():
+            if job["taken_by"] is None and job["steal_at"] and job["steal_at"] <= now:
+                job["taken_by"] = "other"
+                job["taken_at"] = job["steal_at"]
+
+    def listing(self, name):
+        now = time.time()
+        with self.lock:
+            self._settle(now)
+            if name == "active":
+                selected = [j for j in self.jobs.values() if j["taken_by"] == "bot"]
+            else:
+                selected = [j for j in self.jobs.values() if j["taken_by"] is None]
+            return [{
+                "id": j["id"], "date": j["date"], "weekday": j["weekday"],
+                "start": j["start"], "end": j["end"], "title": j["title"],
+                "school": j["school"], "underReview": j["review_until"] > now,
+            } for j in selected]
+
+    def accept(self, job_id):
+        now = time.time()
+        with self.lock:
+            self._settle(now)
+            self.events.append({"type": "confirm", "id": job_id, "at": now})
+            job = self.jobs.get(job_id)
+            if job is None or job["taken_by"] is not None:
+                return ACCEPT_REPLIES["taken"]
+            if job["review_until"] > now:
+                return ACCEPT_REPLIES["review"]
+            job["taken_by"] = "bot"
+            job["taken_at"] = now
+            status, data = ACCEPT_REPLIES["won"]
+            return status, dict(data, jobNumber=job_id)
+
+    def record_event(self, event_type, job_id):
+        with self.lock:
+            self.events.append({"type": event_type, "id": job_id, "at": time.time()})
+
+    def snapshot(self):
+        with self.lock:
+            self._settle(time.time())
+            return [dict(job) for job in self.jobs.values()], list(self.events), list(self.pushes)
+
+    # ==========================================
+    # 🔑 SESSIONS
+    # ==========================================
+    def new_session(self):
+        token = secrets.token_hex(16)
+        with self.lock:
+            self.sessions[token] = time.time() + self.session_ttl
+        return token
+
+    def session_valid(self, token):
+        with self.lock:
+            expires_at = self.sessions.get(token)
+        return expires_at is not None and expires_at > time.time()
+
+
+class FakeHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def fake(self):
+        return self.server.fake
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+        if isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status, data):
+        self._send(status, json.dumps(data), "application/json")
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _logged_in(self):
+        cookies = self.headers.get("Cookie", "")
+        for part in cookies.split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "JSESSIONID":
+                return self.fake.session_valid(value)
+        return False
+
+    def do_GET(self):
+        path = urllib.parse.urlsplit(self.path).path
+        if path == "/logOnInitAction.do":
+            self._send(200, LOGIN_PAGE)
+        elif path in ("/ui", "/ui/"):
+            if not self._logged_in():
+                self._send(302, headers={"Location": "/logOnInitAction.do"})
+            else:
+                self._send(200, APP_PAGE)
+        elif path in ("/api/substitute/jobs/available", "/api/substitute/jobs/active"):
+            if not self._logged_in():
+                self._json(401, {"error": "session expired"})
+            else:
+                self._json(200, {"jobs": self.fake.listing(path.rsplit("/", 1)[-1])})
+        else:
+            self._send(404, "not found", "text/plain")
+
+    def do_POST(self):
+        path = urllib.parse.urlsplit(self.path).path
+        body = self._read_body()
+        if path == "/logOnAction.do":
+            form = urllib.parse.parse_qs(body.decode())
+            if form.get("userId") and form.get("userPin"):
+                token = self.fake.new_session()
+                self._send(302, headers={
+                    "Location": "/ui/#/substitute/jobs/available",
+                    "Set-Cookie": f"JSESSIONID={token}; Path=/; HttpOnly",
+                })
+            else:
+                self._send(302, headers={"Location": "/logOnInitAction.do"})
+        elif path.startswith("/api/substitute/jobs/") and path.endswith("/accept"):
+            if not self._logged_in():
+                self._json(401, {"error": "session expired"})
+                return
+            job_id = int(path.split("/")[-2])
+            status, data = self.fake.accept(job_id)
+            self._json(status, data)
+        elif path == "/_bench/event":
+            event = json.loads(body or b"{}")
+            self.fake.record_event(event.get("type"), event.get("id"))
+            self._send(204)
+        elif path == "/1/messages.json":
+            form = urllib.parse.parse_qs(body.decode())
+            with self.fake.lock:
+                self.fake.pushes.append({
+                    "title": form.get("title", [""])[0],
+                    "message": form.get("message", [""])[0],
+                    "at": time.time(),
+                })
+            self._json(200, {"status": 1})
+        else:
+            self._send(404, "not found", "text/plain")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline SmartFind stand-in")
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--rate", type=float, default=1.0, help="new postings per minute")
+    parser.add_argument("--table-size", type=int, default=20, help="non-target rows always listed")
+    parser.add_argument("--target-ratio", type=float, default=0.5)
+    parser.add_argument("--under-review", type=float, default=0.0, help="share of postings that start Under Review")
+    parser.add_argument("--steal-after", type=float, default=60.0, help="mean seconds before a competitor takes a job")
+    parser.add_argument("--session-ttl", type=float, default=1800)
+    args = parser.parse_args()
+
+    fake = FakeSmartFind(port=args.port, rate_per_min=args.rate, table_size=args.table_size,
+                         target_ratio=args.target_ratio, under_review=args.under_review,
+                         steal_after=args.steal_after, session_ttl=args.session_ttl).start()
+    print(f"🧪 Fake SmartFind running at {fake.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
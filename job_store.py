@@ -0,0 +1,200 @@
+"""
+Durable record of every job the bot has seen.
+
+Jobs are keyed on a stable identity (date, school, start and end time)
+rather than the formatted push message, so rewording a notification
+never re-triggers old jobs. The store is SQLite in WAL mode: opening it
+costs the same no matter how much history it holds, and lookups go
+straight to the primary-key index.
+
+SeenJobs sits in front of the database as a bounded in-memory cache of
+settled jobs, so memory stays flat however long the bot runs.
+"""
+import calendar
+import sqlite3
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+# Outcomes that settle a job for good. "lost", "review" and "crash" are left
+# open so the bot fights again if the job is still listed on the next scan;
+# "taken" means the server told us someone else has it.
+SETTLED_OUTCOMES = ("ignored", "notified", "won", "taken")
+
+
+def make_job_key(job_date, school, start, end):
+    """Stable identity for a posting: the same job always gives the same key."""
+    return "|".join([
+        job_date or "",
+        " ".join((school or "").upper().split()),
+        (start or "").replace(" ", "").upper(),
+        (end or "").replace(" ", "").upper(),
+    ])
+
+
+def job_date_expiry(job_date):
+    """Epoch seconds when the job's day is over (midnight PST), or None if unparseable."""
+    try:
+        day = datetime.strptime(job_date, "%m/%d/%Y")
+    except (TypeError, ValueError):
+        return None
+    return calendar.timegm((day + timedelta(days=1, hours=8)).timetuple())
+
+
+class SeenJobs:
+    """Bounded LRU set of job keys.
+
+    An entry expires when its job date has passed or `ttl` seconds after
+    it was added, whichever comes first. Past `max_size` entries the least
+    recently used one is evicted.
+    """
+
+    def __init__(self, max_size=5000, ttl=14 * 86400):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # job_key -> expires_at
+        self.evicted = 0
+        self.expired = 0
+
+    def add(self, job_key, job_date=None, now=None):
+        now = now or time.time()
+        expires_at = now + self.ttl
+        day_over = job_date_expiry(job_date)
+        if day_over is not None:
+            expires_at = min(expires_at, day_over)
+        if expires_at <= now:
+            self._entries.pop(job_key, None)
+            return
+        self._entries[job_key] = expires_at
+        self._entries.move_to_end(job_key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+    def __contains__(self, job_key):
+        expires_at = self._entries.get(job_key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            del self._entries[job_key]
+            self.expired += 1
+            return False
+        self._entries.move_to_end(job_key)
+        return True
+
+    def expire(self, now=None):
+        """Drops every expired entry. Returns how many were removed."""
+        now = now or time.time()
+        stale = [key for key, expires_at in self._entries.items() if expires_at <= now]
+        for key in stale:
+            del self._entries[key]
+        self.expired += len(stale)
+        return len(stale)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "evicted": self.evicted,
+            "expired": self.expired,
+        }
+
+
+class JobStore:
+    def __init__(self, path="jobs.db", cache_size=5000, cache_ttl=14 * 86400, retention_days=60):
+        self.path = path
+        self.seen = SeenJobs(cache_size, cache_ttl)
+        self.retention_days = retention_days
+        self.pruned = 0
+        self._last_prune = 0.0
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_key    TEXT PRIMARY KEY,
+                job_date   TEXT,
+                summary    TEXT,
+                first_seen REAL NOT NULL,
+                last_seen  REAL NOT NULL,
+                outcome    TEXT NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS jobs_last_seen ON jobs (last_seen)")
+
+    def is_known(self, job_key):
+        """True if this job was already handled and should not be acted on again."""
+        if job_key in self.seen:
+            return True
+        row = self.db.execute("SELECT outcome, job_date FROM jobs WHERE job_key = ?", (job_key,)).fetchone()
+        if row is None or row[0] not in SETTLED_OUTCOMES:
+            return False
+        self.seen.add(job_key, row[1])
+        return True
+
+    def get(self, job_key):
+        row = self.db.execute(
+            "SELECT job_key, job_date, summary, first_seen, last_seen, outcome FROM jobs WHERE job_key = ?",
+            (job_key,),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("job_key", "job_date", "summary", "first_seen", "last_seen", "outcome"), row))
+
+    def record(self, job_key, job_date, summary, outcome):
+        """Inserts a job or updates its outcome; first_seen is kept from the first sighting."""
+        now = time.time()
+        self.db.execute("""
+            INSERT INTO jobs (job_key, job_date, summary, first_seen, last_seen, outcome)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(job_key) DO UPDATE SET
+                summary = excluded.summary,
+                last_seen = excluded.last_seen,
+                outcome = excluded.outcome
+        """, (job_key, job_date, summary, now, now, outcome))
+        if outcome in SETTLED_OUTCOMES:
+            self.seen.add(job_key, job_date, now)
+
+    def touch(self, job_keys):
+        """Bumps last_seen for every job still listed in this scan."""
+        now = time.time()
+        self.db.executemany("UPDATE jobs SET last_seen = ? WHERE job_key = ?",
+                            [(now, key) for key in job_keys])
+
+    def reopen(self, outcome):
+        """Unsettles every job with this outcome so the next scan decides on it again."""
+        cursor = self.db.execute("UPDATE jobs SET outcome = 'reopened' WHERE outcome = ?", (outcome,))
+        self.seen.clear()
+        return cursor.rowcount
+
+    def first_seen_times(self, since):
+        """When each job still on record was first spotted, for the posting profile."""
+        return [row[0] for row in self.db.execute("SELECT first_seen FROM jobs WHERE first_seen >= ?", (since,))]
+
+    def maintain(self):
+        """Expires the in-memory cache; once a day, prunes jobs not listed for `retention_days`."""
+        self.seen.expire()
+        now = time.time()
+        if now - self._last_prune < 86400:
+            return
+        self._last_prune = now
+        cursor = self.db.execute("DELETE FROM jobs WHERE last_seen < ?",
+                                 (now - self.retention_days * 86400,))
+        self.pruned += cursor.rowcount
+
+    def stats(self):
+        stats = {"cache_" + key: value for key, value in self.seen.stats().items()}
+        stats["pruned"] = self.pruned
+        return stats
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def close(self):
+        self.db.close()
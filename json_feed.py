@@ -0,0 +1,266 @@
+"""
+Direct JSON polling for the SmartFind job feeds.
+
+The SmartFind UI is an SPA that pulls its job tables from backend XHRs.
+FeedRecorder watches the browser's responses to learn those endpoints (and
+the headers the SPA sends with them). FeedClient then polls them over a
+pool of keep-alive connections, reusing the browser's session cookies.
+"""
+import http.client
+import json
+import re
+import ssl
+import threading
+import urllib.parse
+
+# Which SPA route each feed belongs to
+FEED_ROUTES = {
+    "available": "jobs/available",
+    "active": "jobs/active",
+}
+
+# Headers the SPA sends that we must NOT copy onto our own requests
+SKIP_HEADERS = {"cookie", "host", "content-length", "accept-encoding", "connection"}
+
+ISO_DATE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2})(?::\d{2}(?:\.\d+)?)?)?')
+CLOCK_24H = re.compile(r'^(\d{1,2}):(\d{2})(?::\d{2})?$')
+SCHOOL_KEYS = re.compile(r'school|location|site|building', re.IGNORECASE)
+
+
+class FeedError(Exception):
+    pass
+
+
+# ==========================================
+# 🛰️ ENDPOINT DISCOVERY
+# ==========================================
+class FeedRecorder:
+    """Remembers which JSON XHR feeds each SmartFind job view.
+
+    Attach `record` to page.on("response"). Endpoints given in `overrides`
+    are pinned and never replaced by discovery.
+    """
+
+    def __init__(self, overrides=None):
+        self.endpoints = {}
+        for name, url in (overrides or {}).items():
+            if url:
+                self.endpoints[name] = {"url": url, "headers": {}, "score": 99}
+
+    def has(self, name):
+        return name in self.endpoints
+
+    def get(self, name):
+        return self.endpoints.get(name)
+
+    def forget(self, name):
+        endpoint = self.endpoints.get(name)
+        if endpoint and endpoint["score"] < 99:
+            del self.endpoints[name]
+
+    def record(self, response):
+        try:
+            request = response.request
+            if request.resource_type not in ("xhr", "fetch"):
+                return
+            if "json" not in response.headers.get("content-type", ""):
+                return
+            if response.status != 200:
+                return
+            frame_url = response.frame.url
+        except Exception:
+            return
+
+        for name, route in FEED_ROUTES.items():
+            if route not in frame_url:
+                continue
+            score = self._score(name, response.url)
+            current = self.endpoints.get(name)
+            # On a tie the feed we already have stays; only its headers are refreshed
+            if current and (current["score"] > score or
+                            (current["score"] == score and current["url"] != response.url)):
+                return
+            headers = {k: v for k, v in request.headers.items()
+                       if k.lower() not in SKIP_HEADERS and not k.startswith(":")}
+            if not current or current["url"] != response.url:
+                print(f"   🛰️ Recorded {name} feed: {response.url}")
+            self.endpoints[name] = {"url": response.url, "headers": headers, "score": score}
+            return
+
+    @staticmethod
+    def _score(name, url):
+        path = urllib.parse.urlsplit(url).path.lower()
+        score = 0
+        if "job" in path:
+            score += 2
+        if name[:5] in path:
+            score += 1
+        return score
+
+
+# ==========================================
+# 🔌 POOLED HTTP CLIENT
+# ==========================================
+class FeedClient:
+    """Polls JSON endpoints over a pool of persistent keep-alive connections.
+
+    Safe to call from several threads at once: each request checks a
+    connection out of the pool and returns it when the response is read.
+    """
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _checkout(self, scheme, netloc):
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop()
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout,
+                                               context=ssl.create_default_context())
+        return http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+    def _checkin(self, scheme, netloc, conn):
+        with self._lock:
+            self._idle.setdefault((scheme, netloc), []).append(conn)
+
+    def close(self):
+        with self._lock:
+            pools, self._idle = self._idle, {}
+        for conns in pools.values():
+            for conn in conns:
+                conn.close()
+
+    def get_json(self, url, cookies, headers=None):
+        """Returns the parsed body, or None when the session has expired."""
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        request_headers = dict(headers or {})
+        request_headers["Accept"] = "application/json"
+        request_headers["Connection"] = "keep-alive"
+        cookie_header = cookie_header_for(parts.hostname, cookies)
+        if cookie_header:
+            request_headers["Cookie"] = cookie_header
+
+        for attempt in (1, 2):
+            conn = self._checkout(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", path, headers=request_headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                # Server dropped the keep-alive connection; reconnect once
+                conn.close()
+                if attempt == 2:
+                    raise
+                continue
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(parts.scheme, parts.netloc, conn)
+            break
+
+        if response.status in (401, 403) or 300 <= response.status < 400:
+            return None
+        if response.status >= 400:
+            raise FeedError(f"HTTP {response.status} from {url}")
+        try:
+            return json.loads(body)
+        except ValueError:
+            # An HTML login page instead of JSON means the session is gone
+            return None
+
+
+def cookie_header_for(host, cookies):
+    pairs = []
+    for cookie in cookies:
+        domain = cookie.get("domain", "").lstrip(".")
+        if not domain or host == domain or host.endswith("." + domain):
+            pairs.append(f"{cookie['name']}={cookie['value']}")
+    return "; ".join(pairs)
+
+
+# ==========================================
+# 🧾 JSON -> ROW TEXT
+# ==========================================
+def normalize_value(value):
+    """Rewrites ISO dates and 24h clock values the way the HTML table shows them."""
+    value = str(value).strip()
+    iso = ISO_DATE.match(value)
+    if iso:
+        year, month, day, hour, minute = iso.groups()
+        parts = [f"{month}/{day}/{year}"]
+        if hour is not None and (hour, minute) != ("00", "00"):
+            parts.append(to_12h(int(hour), minute))
+        return parts
+    clock = CLOCK_24H.match(value)
+    if clock:
+        return [to_12h(int(clock.group(1)), clock.group(2))]
+    return [value]
+
+
+def to_12h(hour, minute):
+    suffix = "AM" if hour < 12 else "PM"
+    return f"{(hour % 12) or 12}:{minute} {suffix}"
+
+
+def iter_values(node, key=""):
+    """Yields (key, normalized text) for every scalar in a JSON tree."""
+    if isinstance(node, dict):
+        for k, v in node.items():
+            yield from iter_values(v, k)
+    elif isinstance(node, list):
+        for v in node:
+            yield from iter_values(v, key)
+    elif node is None or isinstance(node, bool):
+        return
+    else:
+        for text in normalize_value(node):
+            if text:
+                yield key, text
+
+
+def find_job_records(data):
+    """Returns the largest list of objects in the payload (the job rows).
+
+    An empty list means no jobs right now. A payload with no list of
+    objects at all is not a jobs feed, and raises FeedError.
+    """
+    best = None
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            if all(isinstance(x, dict) for x in node) and (best is None or len(node) > len(best)):
+                best = node
+            stack.extend(node)
+    if best is None:
+        raise FeedError("no list of job records in the feed")
+    return best
+
+
+def record_to_row_text(record):
+    """Flattens one job record into the newline-separated text of a table row.
+
+    School/location fields go last, since the row parser treats the last
+    content cell as the school name.
+    """
+    items, school_items = [], []
+    for key, text in iter_values(record):
+        (school_items if SCHOOL_KEYS.search(key) else items).append(text)
+    return "\n".join(items + school_items)
+
+
+def extract_dates(data):
+    dates = set()
+    for _, text in iter_values(data):
+        dates.update(re.findall(r'\d{2}/\d{2}/\d{4}', text))
+    return dates
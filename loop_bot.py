@@ -1,12 +1,26 @@
 import os
 import time
-import http.client
-import urllib.parse
-import ssl
+import asyncio
+import gc
+import json
 import re
 from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from datetime import datetime, timedelta
+from notifier import PushDispatcher
+from job_store import JobStore
+from scheduler import PollScheduler, parse_windows
+from request_filter import RequestFilter, host_resolver_rules
+from memory_watchdog import MemoryWatchdog
+from metrics import Metrics
+from capture import Capture
+from profiles import load_profiles
+from posting_log import PostingLog
+from supervisor import Supervisor, StageTimeout, parse_deadlines, kill_children
+from row_parser import parse_row
+from accept_reply import classify_accept_response
+from rules import RuleEngine, NOTIFY, IGNORE, DATE_REASONS
+from json_feed import FeedRecorder, FeedClient, FeedError, find_job_records, record_to_row_text, extract_dates
 
 # ==========================================
 # ⚙️ CONFIGURATION
@@ -16,103 +30,733 @@ SF_USERNAME = os.getenv("SF_USERNAME")
 SF_PASSWORD = os.getenv("SF_PASSWORD")
 PUSHOVER_USER = os.getenv("PUSHOVER_USER")
 PUSHOVER_TOKEN = os.getenv("PUSHOVER_TOKEN")
+PUSHOVER_API = os.getenv("PUSHOVER_API", "https://api.pushover.net")  # point at a local stand-in for testing
 
 # --- 🎛️ CONTROL PANEL ---
-AUTO_ACCEPT_ENABLED = True 
-ENABLE_24H_RULE = True 
-
-MANUAL_BLACKOUT_DATES = [
-    # April 30 - May 10
-    "04/30/2026", 
-    "05/01/2026", "05/02/2026", "05/03/2026", "05/04/2026", "05/05/2026",
-    "05/06/2026", "05/07/2026", "05/08/2026", "05/09/2026", "05/10/2026"
-]
-BLACKOUT_RANGE_START = None
-BLACKOUT_RANGE_END   = None
-NOTIFY_ONLY_DATES = []
-
-TARGET_HIGH_SCHOOLS = [
-    "EL CERRITO",
-    "RICHMOND HIGH",
-    "PINOLE",
-    "KENNEDY",
-    "DE ANZA",
-    "HERCULES HIGH"
-]
-
-AUTO_ACCEPT_MIN_HOURS = 4.5    
-AUTO_ACCEPT_MAX_HOURS = 9.0    
-NOTIFICATION_MIN_HOURS = 4.5   
-
-LOGIN_FAIL_COUNT = 0
-LAST_HEARTBEAT_DATE = None
+# Schools, blackout dates and hour limits live in rules.toml and are
+# reloaded whenever that file changes.
+RULES_PATH = os.getenv("RULES_PATH", "rules.toml")
+
+# How long the "days we already work" list from the active-jobs page is trusted.
+# Winning a job refreshes it right away regardless.
+ACTIVE_REFRESH_MINUTES = int(os.getenv("ACTIVE_REFRESH_MINUTES", "30"))
+
+# Where seen jobs are remembered across restarts (mount a volume here in Docker)
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "jobs.db")
+# Login cookies are kept here so a restart doesn't need a fresh login ("" turns it off)
+SESSION_STATE_PATH = os.getenv("SESSION_STATE_PATH", "session.json")
+# Every row of every scan is logged here for later analysis (posting_log.py); "" turns it off
+POSTING_LOG_DIR = os.getenv("POSTING_LOG_DIR", "postings")
+POSTING_SEGMENT_HOURS = float(os.getenv("POSTING_SEGMENT_HOURS", "24"))
+
+# --- 👥 ACCOUNTS ---
+# One process can scan several accounts/districts, each in its own browser
+# context; see profiles.py for the file format. Without the file, the single
+# account configured above is used.
+PROFILES_PATH = os.getenv("PROFILES_PATH", "profiles.toml")
+BASE_URL = os.getenv("SF_BASE_URL", "https://westcontracosta.eschoolsolutions.com")
+
+# --- 🌐 BROWSER SESSION ---
+
+BROWSER_RECYCLE_SCANS = int(os.getenv("BROWSER_RECYCLE_SCANS", "180"))     # relaunch Chromium after N scans
+BROWSER_RECYCLE_MINUTES = int(os.getenv("BROWSER_RECYCLE_MINUTES", "240")) # ...or after this much uptime
+
+# --- 🧠 MEMORY WATCHDOG ---
+# Memory is sampled after every scan. Over the soft limit, or every
+# CONTEXT_RECYCLE_SCANS, the browser context is swapped for a fresh one
+# (keeping the login); over a hard limit Chromium is relaunched. 0 disables a check.
+CONTEXT_RECYCLE_SCANS = int(os.getenv("CONTEXT_RECYCLE_SCANS", "60"))
+BROWSER_SOFT_LIMIT_MB = int(os.getenv("BROWSER_SOFT_LIMIT_MB", "600"))
+BROWSER_HARD_LIMIT_MB = int(os.getenv("BROWSER_HARD_LIMIT_MB", "900"))
+PYTHON_LIMIT_MB = int(os.getenv("PYTHON_LIMIT_MB", "300"))
+
+# --- 🚧 REQUEST FILTER ---
+# We only read table text, so images, media, fonts and analytics are aborted
+# before they download. Analytics hosts are cut off with a launch flag; only
+# URLs that look like a blocked type are routed through Python, so the rest
+# keep the HTTP cache. URLs matching ROUTE_ALLOW always load; the default
+# keeps the Accept icon and the confirm dialog intact. ROUTE_FILTER=0 turns it off.
+ROUTE_FILTER = os.getenv("ROUTE_FILTER", "1") == "1"
+ROUTE_BLOCK_TYPES = os.getenv("ROUTE_BLOCK_TYPES", "image,media,font").split(",")
+ROUTE_BLOCK_HOSTS = os.getenv("ROUTE_BLOCK_HOSTS", "google-analytics.com,googletagmanager.com,doubleclick.net,"
+                              "hotjar.com,nr-data.net,newrelic.com,clarity.ms,fullstory.com,segment.io").split(",")
+ROUTE_ALLOW = os.getenv("ROUTE_ALLOW", r"accept|confirm|check|icon|fontawesome|glyph")
+
+# --- 📈 METRICS ---
+# Per-stage timings and counters, served as Prometheus text on
+# http://METRICS_HOST:METRICS_PORT/metrics (port 0 turns the endpoint off).
+# A rolling per-stage summary is printed every METRICS_SUMMARY_SCANS scans.
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+METRICS_SUMMARY_SCANS = int(os.getenv("METRICS_SUMMARY_SCANS", "30"))
+
+# --- 📼 RECORD / REPLAY ---
+# HAR_MODE=record saves each browser context's traffic as a HAR file, plus DOM
+# snapshots of every view and accept step, under CAPTURE_DIR. HAR_MODE=replay
+# serves a recorded HAR (REPLAY_HAR, or the newest one) to Chromium instead of
+# the network, prints pushes instead of sending them and uses a throwaway job
+# store, so whole scans can be rerun offline. REPLAY_SPEED > 1 runs the poll
+# schedule that many times faster.
+HAR_MODE = os.getenv("HAR_MODE", "")
+CAPTURE_DIR = os.getenv("CAPTURE_DIR", "captures")
+REPLAY_HAR = os.getenv("REPLAY_HAR")
+REPLAY_SPEED = float(os.getenv("REPLAY_SPEED", "1"))
+
+# --- 🕰️ POLL SCHEDULE (PST) ---
+# Seconds between browser scans per time window, first match wins. Absences
+# mostly get posted in the early-morning rush, so that's when we poll hardest.
+POLL_WINDOWS = os.getenv("POLL_WINDOWS", "mon-fri 05:00-08:00=20, mon-fri 08:00-18:00=60, mon-fri 18:00-22:00=120, *=300")
+POLL_JITTER = 0.15
+LEARN_POLL_PROFILE = os.getenv("LEARN_POLL_PROFILE", "1") == "1"  # tune windows from past posting times
+
+# --- 🛰️ POLLING MODE ---
+# "browser" renders the jobs page every scan; "json" polls the SPA's own jobs
+# feeds directly and only uses Chromium for login and auto-accept; "watch"
+# keeps the jobs page open and reacts to rows as the SPA renders them, with
+# scheduled scans only doing housekeeping.
+POLL_MODE = os.getenv("POLL_MODE", "browser")
+JSON_POLL_SECONDS = int(os.getenv("JSON_POLL_SECONDS", "15"))
+WATCH_REFRESH_SECONDS = float(os.getenv("WATCH_REFRESH_SECONDS", "5"))   # how often the SPA is told to refetch
+WATCH_RESEND_SECONDS = float(os.getenv("WATCH_RESEND_SECONDS", "60"))    # unchanged rows are re-checked this often
+WATCH_REFRESH_SELECTOR = os.getenv("WATCH_REFRESH_SELECTOR",
+                                   "#refresh, [title*='Refresh' i], [aria-label*='Refresh' i]")
+if HAR_MODE == "replay" and POLL_MODE == "json":
+    POLL_MODE = "browser"  # feed polls bypass Chromium, so a HAR can't answer them
+AVAILABLE_JOBS_API = os.getenv("SF_AVAILABLE_JOBS_API")  # optional: skip endpoint discovery
+ACTIVE_JOBS_API = os.getenv("SF_ACTIVE_JOBS_API")
+
+# --- ⚔️ AUTO-ACCEPT ---
+# The outcome of an accept comes from the server's reply to Confirm: the first
+# non-GET request whose URL matches ACCEPT_API_PATTERN. If none shows up within
+# ACCEPT_RESPONSE_SECONDS, the page is watched for the banner instead.
+ACCEPT_API_PATTERN = re.compile(os.getenv("ACCEPT_API_PATTERN", r"accept"), re.I)
+ACCEPT_RESPONSE_SECONDS = float(os.getenv("ACCEPT_RESPONSE_SECONDS", "8"))
+ACCEPT_PAGE_SECONDS = 12
+# Jobs found in the same scan are fought for at once, one tab each, in the
+# order rules.toml's [priority] ranks them. Same-date jobs wait their turn.
+ACCEPT_MAX_TABS = max(1, int(os.getenv("ACCEPT_MAX_TABS", "3")))
+
+# --- ⏱️ PAGE READINESS ---
+# Each stage moves on the moment its data is on screen; these are only the
+# upper bounds. RENDER_GRACE_MS is how long the table gets to render once the
+# jobs XHR itself has come back.
+STAGE_TIMEOUTS = {"login": 15, "active": 6, "available": 15}  # seconds
+RENDER_GRACE_MS = 1500
+# What each view says when it has no rows. A view that shows neither rows nor
+# this text in time is a timeout, never an empty list.
+EMPTY_VIEW_TEXT = {
+    "available": os.getenv("AVAILABLE_EMPTY_TEXT", "there are no jobs available"),
+    "active": os.getenv("ACTIVE_EMPTY_TEXT", "no active jobs"),
+}
+
+# --- ⏰ HARD DEADLINES ---
+# Unlike the timeouts above, these can't be outlived: a stage that runs past
+# its deadline is cancelled, the scan counts as missed and the browser is
+# restarted (see supervisor.py). RESTART_PROCESS_AFTER missed scans in a row
+# restart the whole bot, and so does a scan still running HANG_SECONDS after
+# it started (0: twice the scan deadline). A login runs inside the active or
+# available stage (view, login, view again), so keep login well below both.
+STAGE_DEADLINES = parse_deadlines(os.getenv(
+    "STAGE_DEADLINES", "launch=60, login=30, active=45, available=75, accept=120, scan=300, close=20"))
+RESTART_PROCESS_AFTER = int(os.getenv("RESTART_PROCESS_AFTER", "3"))
+HANG_SECONDS = float(os.getenv("HANG_SECONDS", "0"))
 
 # ==========================================
 # 📟 NOTIFICATION SYSTEM
 # ==========================================
-def send_push(message, title="SmartFind Bot"):
-    try:
-        context = ssl._create_unverified_context()
-        conn = http.client.HTTPSConnection("api.pushover.net:443", context=context)
-        payload = urllib.parse.urlencode({
-            "token": PUSHOVER_TOKEN,
-            "user": PUSHOVER_USER,
-            "message": message,
-            "title": title
-        })
-        conn.request("POST", "/1/messages.json", payload, {"Content-type": "application/x-www-form-urlencoded"})
-        conn.getresponse()
-    except:
-        pass
+NOTIFIERS = {}
+
+def get_notifier(token, user):
+    """One background dispatcher per Pushover target, shared by accounts that use it."""
+    if (token, user) not in NOTIFIERS:
+        NOTIFIERS[(token, user)] = PushDispatcher(token, user, api_url=PUSHOVER_API)
+    return NOTIFIERS[(token, user)]
 
 # ==========================================
 # 🛡️ RULES & LOGIC
 # ==========================================
-def is_target_school(clean_msg):
-    msg_upper = clean_msg.upper()
-    if any(hs in msg_upper for hs in TARGET_HIGH_SCHOOLS):
-        return True
-    if "MIDDLE" in msg_upper and "SP ED" in msg_upper:
+class BlackoutCache:
+    """Days we already work, from the active-jobs page (rules.toml has the rest).
+
+    The active-jobs dates only change when we win or cancel a job, so they
+    are refetched every ACTIVE_REFRESH_MINUTES, or right after a win.
+    """
+
+    def __init__(self, refresh_seconds):
+        self.refresh_seconds = refresh_seconds
+        self.active_dates = set()
+        self.won_dates = set()  # days we just won that the active view hasn't shown yet
+        self.fetched_at = 0.0
+
+    def is_stale(self):
+        return time.time() - self.fetched_at >= self.refresh_seconds
+
+    def update(self, active_dates):
+        self.won_dates -= set(active_dates)
+        self.active_dates = set(active_dates) | self.won_dates
+        self.fetched_at = time.time()
+
+    def add(self, date):
+        """Blocks a day we just won, before the active view has caught up."""
+        self.won_dates.add(date)
+        self.active_dates.add(date)
+
+    def invalidate(self):
+        self.fetched_at = 0.0
+
+    def blocked(self):
+        return set(self.active_dates)
+
+class Account:
+    """One SmartFind login: its profile plus everything the bot keeps for it.
+
+    Accounts share the browser but each gets its own context (cookies,
+    tabs), job store, rules, blackout cache and recorded feeds.
+    """
+
+    def __init__(self, profile, tag=""):
+        self.profile = profile
+        self.name = profile.name
+        self.tag = tag
+        self.notifier = get_notifier(profile.pushover_token, profile.pushover_user)
+        self.rules = RuleEngine(profile.rules)
+        self.blackout = BlackoutCache(ACTIVE_REFRESH_MINUTES * 60)
+        self.feeds = FeedRecorder({"available": profile.available_api, "active": profile.active_api})
+        # A replay must never mark real jobs as seen
+        self.job_store = JobStore(":memory:" if CAPTURE.replaying else profile.job_store)
+        self.postings = None
+        if profile.posting_log and not CAPTURE.replaying:
+            self.postings = PostingLog(profile.posting_log, POSTING_SEGMENT_HOURS)
+        self.login_fail_count = 0
+        self.last_heartbeat_date = None
+
+        # Browser state, managed by BrowserSession
+        self.context = None
+        self.pages = {}
+        self.crashed = set()
+        self.context_scans = 0
+        self.logged_in_at = 0.0
+        self.session_valid = None  # what the probe said about the saved session, until acted on
+        self.login_lock = asyncio.Lock()
+        self.watch_page = None
+        self.watch_events = None
+        self.watch_task = None
+        self.watch_lock = asyncio.Lock()
+
+    def push(self, message, title="SmartFind Bot"):
+        """Queues a push on the background dispatcher; never blocks the scan."""
+        if CAPTURE.replaying:
+            print(f"   📨 [replay] {title}{self.tag}: {message}")
+            return
+        self.notifier.send(message, title + self.tag)
+
+    def close(self):
+        self.notifier.flush()
+        self.job_store.close()
+        if self.postings is not None:
+            self.postings.close()
+
+    def record(self, job_key, job_date, summary, outcome):
+        """Remembers what we decided about a job, in the job store and the posting log."""
+        self.job_store.record(job_key, job_date, summary, outcome)
+        if self.postings is not None:
+            self.postings.outcome(job_key, outcome)
+
+def load_accounts():
+    defaults = {
+        "base_url": BASE_URL,
+        "username": SF_USERNAME,
+        "password": SF_PASSWORD,
+        "pushover_user": PUSHOVER_USER,
+        "pushover_token": PUSHOVER_TOKEN,
+        "rules": RULES_PATH,
+        "job_store": JOB_STORE_PATH,
+        "session_state": SESSION_STATE_PATH,
+        "posting_log": POSTING_LOG_DIR,
+        "poll_windows": POLL_WINDOWS,
+        "available_api": AVAILABLE_JOBS_API,
+        "active_api": ACTIVE_JOBS_API,
+    }
+    profiles = load_profiles(PROFILES_PATH, defaults)
+    accounts = []
+    for profile in profiles:
+        if not (profile.username and profile.password):
+            print(f"   ⚠️ Profile {profile.name} has no username/password set.")
+        # With several accounts, pushes say which one they are about
+        account = Account(profile, f" [{profile.name}]" if len(profiles) > 1 else "")
+        METRICS.register("job_store", account.job_store.stats, account=account.name)
+        accounts.append(account)
+    return accounts
+
+async def get_active_dates(account, page):
+    """Dates on the active-jobs page, or None if it could not be read."""
+    try:
+        with METRICS.timer("active_dates", account=account.name):
+            return await SUPERVISOR.within("active", read_active_dates(account, page))
+    except StageTimeout as e:
+        print(f"   ⏰ Active jobs check abandoned: {e}")
+        account.crashed.add("active")
+        return None
+    except Exception:
+        return None
+
+async def read_active_dates(account, page):
+    """Dates on the active-jobs view, or None if it didn't load (so the old dates are kept)."""
+    state = await goto_authenticated(account, page, account.profile.active_jobs_url, "active")
+    if state == "empty":
+        return set()
+    if state != "rows":
+        return None
+    content = await page.content()
+    return set(re.findall(r'\d{2}/\d{2}/\d{4}', content))
+
+# ==========================================
+# 🌐 PERSISTENT BROWSER SESSION
+# ==========================================
+class BrowserSession:
+    """Keeps one Chromium alive between scans, shared by every account.
+
+    Each account gets its own context (so cookies never mix) with one tab
+    per view. The browser is relaunched when it dies, or on the recycle
+    schedule (BROWSER_RECYCLE_SCANS / BROWSER_RECYCLE_MINUTES) so slow
+    leaks in the renderer never build up. Between those, the memory
+    watchdog can swap in a fresh context after any scan, and a crashed tab
+    is replaced on its next use. Seen jobs live in each account's JobStore,
+    so none of this loses dedup state.
+    """
+
+    def __init__(self):
+        self.playwright = None
+        self.browser = None
+        self.accounts = {}  # name -> Account with a live context
+        self.launched_at = 0.0
+        self.scans = 0
+        self.crashes = 0
+        self.launch_lock = asyncio.Lock()
+
+    def _needs_recycle(self):
+        if self.scans >= BROWSER_RECYCLE_SCANS:
+            return True
+        return time.time() - self.launched_at >= BROWSER_RECYCLE_MINUTES * 60
+
+    async def _launch(self):
+        print("   🌐 Launching Chromium...")
+        self.playwright = await async_playwright().start()
+        args = [
+            "--no-sandbox", 
+            "--disable-setuid-sandbox", 
+            "--disable-dev-shm-usage", 
+            "--disable-gpu", 
+            "--single-process", 
+            "--no-zygote",
+            "--disable-extensions"
+        ]
+        if ROUTE_FILTER and not CAPTURE.replaying and host_resolver_rules(ROUTE_BLOCK_HOSTS):
+            args.append(host_resolver_rules(ROUTE_BLOCK_HOSTS))
+        self.browser = await self.playwright.chromium.launch(headless=True, args=args)
+        self.browser.on("disconnected", self._on_disconnect)
+        self.launched_at = time.time()
+        self.scans = 0
+
+    async def _new_context(self, account, storage_state=None):
+        saved = None if CAPTURE.replaying else account.profile.session_state
+        restoring = storage_state is None and saved and os.path.exists(saved)
+        options = CAPTURE.context_options(account.name)
+        try:
+            account.context = await self.browser.new_context(
+                viewport={'width': 1920, 'height': 1080}, storage_state=saved if restoring else storage_state,
+                **options
+            )
+        except Exception as e:
+            if not restoring:
+                raise
+            print(f"   ⚠️ Saved session {saved} is unreadable ({e}); starting fresh.")
+            restoring = False
+            account.context = await self.browser.new_context(viewport={'width': 1920, 'height': 1080}, **options)
+        await CAPTURE.install(account.context)
+        if ROUTE_FILTER and not CAPTURE.replaying and REQUEST_FILTER.url_pattern():
+            await account.context.route(REQUEST_FILTER.url_pattern(), REQUEST_FILTER.handle)
+        account.pages = {}
+        account.crashed = set()
+        account.context_scans = 0
+        if storage_state is None:
+            account.logged_in_at = 0.0
+        self.accounts[account.name] = account
+        if restoring:
+            account.session_valid = await probe_session(account)
+            verdict = {True: "still valid", False: "expired", None: "unknown, trying it"}[account.session_valid]
+            print(f"   🍪 Saved session for {account.name}: {verdict}.")
+
+    async def save_state(self, account, state=None):
+        """Writes the account's cookies and local storage to its session file."""
+        path = account.profile.session_state
+        if not path or account.context is None or CAPTURE.replaying:
+            return
+        try:
+            state = state or await account.context.storage_state()
+            # Owner-only: the file holds live login cookies
+            partial = path + ".tmp"
+            fd = os.open(partial, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(state, f)
+            os.replace(partial, path)
+        except Exception as e:
+            print(f"   ⚠️ Could not save session for {account.name}: {e}")
+
+    async def _new_page(self, account, name):
+        page = await account.context.new_page()
+        page.on("dialog", lambda dialog: dialog.accept())
+        page.on("response", account.feeds.record)
+        page.on("crash", lambda page: self._on_crash(account, name))
+        account.pages[name] = page
+        return page
+
+    def _on_crash(self, account, name):
+        print(f"   💥 The {account.name}/{name} tab crashed; it will be replaced.")
+        self.crashes += 1
+        account.crashed.add(name)
+
+    def _on_disconnect(self, browser):
+        if browser is self.browser:
+            print("   💥 Chromium went away; relaunching on next use.")
+            self.crashes += 1
+
+    async def cookies(self, account):
+        if account.context is None:
+            return None
+        return await account.context.cookies()
+
+    async def start_scan(self, account):
+        """Recycles the browser when it is due. Call once per scan."""
+        if self.browser is not None and self._needs_recycle():
+            print("   ♻️ Recycling browser (scheduled)...")
+            await self.close()
+        self.scans += 1
+        account.context_scans += 1
+
+    async def end_scan(self, account):
+        """Samples memory and recycles what the watchdog asks for. Call after each scan."""
+        if self.browser is None:
+            return
+        if not self.browser.is_connected():
+            await self.close()
+            return
+        action, reason = WATCHDOG.check(account.context_scans)
+        if action is None and account.crashed:
+            action, reason = "context", "a tab crashed"
+        if action == "browser":
+            print(f"   ♻️ Recycling browser ({reason})...")
+            await self.close()
+            gc.collect()
+        elif action == "context" and account.context is not None:
+            print(f"   ♻️ Recycling {account.name} browser context ({reason})...")
+            await self.recycle_context(account)
+
+    async def recycle_context(self, account):
+        """Swaps in a fresh context, carrying the cookies over so we stay logged in."""
+        async with self.launch_lock:
+            state = None
+            try:
+                state = await account.context.storage_state()
+                await self.save_state(account, state)
+            except Exception as e:
+                print(f"   ⚠️ Could not save session state: {e}")
+            try:
+                await account.context.close()
+            except Exception:
+                pass
+            try:
+                await self._new_context(account, state)
+            except Exception as e:
+                print(f"   ⚠️ Context recycle failed ({e}); relaunching browser.")
+                await self.close()
+
+    async def get_page(self, account, name="available"):
+        """Returns the account's live tab for `name`, launching the browser if needed."""
+        async with self.launch_lock:
+            if self.browser is None or not self.browser.is_connected():
+                await self.close()
+                await self._launch()
+            if account.context is None:
+                await self._new_context(account)
+            page = account.pages.get(name)
+            if name in account.crashed:
+                account.crashed.discard(name)
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+                page = None
+            if page is None or page.is_closed():
+                page = await self._new_page(account, name)
+            return page
+
+    async def close(self):
+        if self.browser is not None and self.browser.is_connected():
+            for account in self.accounts.values():
+                if account.logged_in_at or account.session_valid:
+                    await self.save_state(account)
+        browser, playwright, contexts = self._forget()
+        if browser is not None and ROUTE_FILTER:
+            print(f"   🚧 Request filter: {REQUEST_FILTER.summary()}")
+        # Contexts first: that is when a recording HAR gets written out
+        closers = [lambda context=context: context.close() for context in contexts]
+        for closer in closers + [
+            lambda: browser and browser.close(),
+            lambda: playwright and playwright.stop(),
+        ]:
+            try:
+                pending = closer()
+                if pending:
+                    await pending
+            except Exception:
+                pass
+
+    def _forget(self):
+        """Drops every reference to the current browser. Returns (browser, playwright, contexts)."""
+        browser, playwright = self.browser, self.playwright
+        contexts = [account.context for account in self.accounts.values() if account.context is not None]
+        self.playwright = None
+        self.browser = None
+        for account in self.accounts.values():
+            account.context = None
+            account.pages = {}
+            account.crashed = set()
+            account.logged_in_at = 0.0
+            account.session_valid = None
+        self.accounts = {}
+        return browser, playwright, contexts
+
+    def kill(self):
+        """Forgets the browser and SIGKILLs it: for when it no longer answers at all."""
+        self._forget()
+        print(f"   🔪 Killed {kill_children()} browser processes.")
+
+    async def restart(self, reason):
+        """Throws the browser away after a missed deadline; the next scan launches a new one."""
+        print(f"   🔁 Restarting browser ({reason})...")
+        SUPERVISOR.browser_restarts += 1
+        try:
+            await SUPERVISOR.within("close", self.close())
+        except StageTimeout:
+            print("   ⚠️ Browser did not close in time.")
+            self.kill()
+
+METRICS = Metrics()
+WATCHDOG = MemoryWatchdog(BROWSER_SOFT_LIMIT_MB, BROWSER_HARD_LIMIT_MB, PYTHON_LIMIT_MB, CONTEXT_RECYCLE_SCANS)
+CAPTURE = Capture(HAR_MODE, CAPTURE_DIR, REPLAY_HAR)
+REQUEST_FILTER = RequestFilter(ROUTE_BLOCK_TYPES, ROUTE_BLOCK_HOSTS, ROUTE_ALLOW)
+FEED_CLIENT = FeedClient()
+SESSION = BrowserSession()
+SUPERVISOR = Supervisor(STAGE_DEADLINES, RESTART_PROCESS_AFTER, HANG_SECONDS)
+
+def push_stats():
+    totals = {}
+    for notifier in NOTIFIERS.values():
+        for key, value in notifier.stats().items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+METRICS.register("memory", WATCHDOG.stats)
+METRICS.register("request_filter", REQUEST_FILTER.stats)
+METRICS.register("browser", lambda: {"scans": SESSION.scans, "crashes": SESSION.crashes})
+METRICS.register("push", push_stats)
+METRICS.register("supervisor", SUPERVISOR.stats)
+
+async def login(account, page):
+    """Submits the login form (main page or any frame). Returns True on submit."""
+    profile = account.profile
+
+    print(f"   🔑 Logging in ({account.name})...")
+    await page.goto(profile.login_url, wait_until="domcontentloaded")
+
+    login_success = False
+    try:
+        await page.locator("#userId").fill(profile.username, timeout=2000)
+        await page.locator("#userPin").fill(profile.password, timeout=2000)
+        await page.locator("#userPin").press("Enter")
+        login_success = True
+    except Exception:
+        for frame in page.frames:
+            try:
+                await frame.locator("#userId").fill(profile.username, timeout=1000)
+                await frame.locator("#userPin").fill(profile.password, timeout=1000)
+                await frame.locator("#userPin").press("Enter")
+                login_success = True
+                break
+            except Exception:
+                continue
+
+    if login_success and not await wait_for_login_to_clear(page):
+        print("   ⚠️ Still on the login form after submitting.")
+        login_success = False
+
+    if not login_success:
+        METRICS.inc("login_failures_total", account=account.name)
+        account.login_fail_count += 1
+        if account.login_fail_count >= 5:
+            account.push("🔴 CRITICAL: Bot cannot login (5 failures). Check password or site.", title="Login Error")
+            account.login_fail_count = 0 
+        return False
+
+    account.login_fail_count = 0
+    return True
+
+async def ensure_logged_in(account, page, since):
+    """Logs in once, even when several tabs hit the login form at the same time."""
+    async with account.login_lock:
+        if account.logged_in_at > since:
+            return True
+        with METRICS.timer("login", account=account.name):
+            logged_in = await SUPERVISOR.within("login", login(account, page))
+        if not logged_in:
+            return False
+        account.logged_in_at = time.time()
+        await SESSION.save_state(account)
         return True
-    return False
 
-def check_24h_rule(job_date_str):
-    if not ENABLE_24H_RULE:
-        return True 
+async def probe_session(account):
+    """Cheap check that the context's cookies are still logged in, without rendering the SPA.
+
+    Asks for the jobs feed if we know it, else the SPA shell; an expired
+    session gets a 401/403 or a redirect to the login form. Returns None when
+    the probe can't tell, so the usual login-page detection decides.
+    """
+    feed = account.feeds.get("available")
+    url = feed["url"] if feed else f"{account.profile.base_url}/ui/"
     try:
-        job_dt = datetime.strptime(job_date_str, "%m/%d/%Y")
-        now_pst = datetime.utcnow() - timedelta(hours=8)
-        if (job_dt - now_pst).total_seconds() < 86400:
+        response = await account.context.request.get(url, max_redirects=0, timeout=5000)
+        if 300 <= response.status < 400:
+            return "logOnInitAction" not in response.headers.get("location", "logOnInitAction")
+        if response.status in (401, 403):
             return False
-        return True 
-    except:
-        return False
+        if not response.ok:
+            return None
+        return "userId" not in await response.text()
+    except Exception as e:
+        print(f"   ⚠️ Session probe failed: {e}")
+        return None
+
+async def wait_for_login_to_clear(page):
+    """Waits until the login form is gone, i.e. the server accepted the submit."""
+    deadline = time.time() + STAGE_TIMEOUTS["login"]
+    while time.time() < deadline:
+        if not await is_login_page(page):
+            return True
+        await asyncio.sleep(0.1)
+    return False
+
+async def is_login_page(page):
+    """True when SmartFind bounced us back to the login form (session expired)."""
+    if "logOnInitAction" in page.url:
+        return True
+    for frame in page.frames:
+        try:
+            if await frame.locator("#userId").count() > 0:
+                return True
+        except Exception:
+            continue
+    return False
+
+# Resolves to "login", "empty" or "rows" once the SPA has drawn the view.
+# Rows still on screen from the previous view are stamped data-sf-stale
+# before navigating, so they can't satisfy the check.
+VIEW_READY_JS = """
+(emptyText) => {
+    if (location.href.includes("logOnInitAction") || document.querySelector("#userId")) return "login";
+    for (const frame of document.querySelectorAll("iframe")) {
+        try { if (frame.contentDocument.querySelector("#userId")) return "login"; } catch (e) {}
+    }
+    for (const tr of document.querySelectorAll("tr:not([data-sf-stale])")) {
+        if (tr.querySelector("td") && /\\d{2}\\/\\d{2}\\/\\d{4}/.test(tr.textContent)) return "rows";
+    }
+    if (emptyText && document.body && document.body.innerText.toLowerCase().includes(emptyText)) return "empty";
+    return false;
+}
+"""
+
+# Makes the SPA refetch the current view: its own refresh control if it has
+# one, otherwise the hashchange its router listens for.
+SPA_REFRESH_JS = """
+(selector) => {
+    const button = document.querySelector(selector);
+    if (button) button.click();
+    else window.dispatchEvent(new HashChangeEvent("hashchange"));
+}
+"""
+
+async def open_view(account, page, url, feed_name):
+    """Navigates to a jobs view and returns as soon as its data is ready.
+
+    When the view's JSON feed is known, the feed response is the signal and
+    the DOM only gets RENDER_GRACE_MS to catch up. Returns "login", "empty",
+    "rows" or "timeout".
+    """
+    timeout_ms = STAGE_TIMEOUTS[feed_name] * 1000
+    await page.evaluate("() => document.querySelectorAll('tr').forEach(tr => tr.setAttribute('data-sf-stale', ''))")
+
+    async def navigate():
+        # Same URL means no hashchange; have the SPA refetch the way watch mode
+        # does, instead of reloading the whole app
+        if page.url == url:
+            await page.evaluate(SPA_REFRESH_JS, WATCH_REFRESH_SELECTOR)
+        else:
+            await page.goto(url, wait_until="domcontentloaded")
+
+    feed = account.feeds.get(feed_name)
+    started = time.time()
+    if feed:
+        try:
+            async with page.expect_response(lambda r: r.url == feed["url"], timeout=timeout_ms):
+                await navigate()
+            timeout_ms = RENDER_GRACE_MS
+        except PlaywrightTimeoutError:
+            timeout_ms = max(timeout_ms - int((time.time() - started) * 1000), RENDER_GRACE_MS)
+    else:
+        await navigate()
 
-def get_active_dates(page):
-    blocked_dates = set()
-    for date in MANUAL_BLACKOUT_DATES:
-        blocked_dates.add(date)
     try:
-        page.goto("https://westcontracosta.eschoolsolutions.com/ui/#/substitute/jobs/active", wait_until="networkidle")
-        time.sleep(3)
-        content = page.content()
-        found_dates = re.findall(r'\d{2}/\d{2}/\d{4}', content)
-        for date in found_dates:
-            blocked_dates.add(date)
-    except:
-        pass
-    return blocked_dates
+        handle = await page.wait_for_function(VIEW_READY_JS, arg=EMPTY_VIEW_TEXT[feed_name].lower(), polling=100, timeout=timeout_ms)
+        state = await handle.json_value()
+    except PlaywrightTimeoutError:
+        state = "login" if await is_login_page(page) else "timeout"
+    elapsed = time.time() - started
+    await CAPTURE.snapshot(page, f"{account.name}-{feed_name}-{state}")
+    METRICS.observe(f"{feed_name}_view", elapsed, account=account.name)
+    METRICS.inc("views_total", account=account.name, view=feed_name, state=state)
+    print(f"   ⏱️ {feed_name} view: {state} in {elapsed:.1f}s")
+    return state
+
+async def goto_authenticated(account, page, url, feed_name):
+    """Opens a jobs view, logging in again only if the session expired.
+
+    Returns the view state from open_view, or None if we could not log in.
+    """
+    checked_at = time.time()
+    if account.session_valid is False:
+        # The saved session is known to be dead; go straight to the login form
+        account.session_valid = None
+        if not await ensure_logged_in(account, page, checked_at):
+            return None
+    state = await open_view(account, page, url, feed_name)
+    if state != "login":
+        return state
+    if not await ensure_logged_in(account, page, checked_at):
+        return None
+    state = await open_view(account, page, url, feed_name)
+    return None if state == "login" else state
 
 # ==========================================
 # 🤖 BROWSER ACTIONS
 # ==========================================
-def attempt_auto_accept(page, row_element, job_details):
+async def attempt_auto_accept(page, row_element, job_details):
     print(f"   ⚔️ ENGAGING COMBAT MODE...")
     
     # SAFETY NET KEEPS THE BOT FROM CRASHING SILENTLY
     try:
         max_loops = 15 # ~45 seconds of fighting
         loop_count = 0
+        last_outcome = "LOST"
         
         while loop_count < max_loops:
             loop_count += 1
@@ -123,251 +767,682 @@ def attempt_auto_accept(page, row_element, job_details):
                 accept_cell = row_element.locator("td").last
                 icon = accept_cell.locator("svg, i, span, img, a, button").first
                 
-                if icon.is_visible():
-                    icon.click(force=True, timeout=2000)
+                if await icon.is_visible():
+                    await icon.click(force=True, timeout=2000)
                 else:
-                    accept_cell.click(force=True, timeout=2000)
+                    await accept_cell.click(force=True, timeout=2000)
             except Exception as e:
                 print("      ⚠️ Failed to click the Accept column. Retrying...")
-                time.sleep(1)
+                await asyncio.sleep(1)
                 continue
 
             # 2. Wait for the Custom Modal to appear
             try:
                 print("      ⏳ Checking for Confirm Modal...")
                 confirm_btn = page.locator("button:has-text('Confirm')").first
-                confirm_btn.wait_for(state="visible", timeout=3000) 
+                await confirm_btn.wait_for(state="visible", timeout=3000) 
                 
                 print("      👉 Modal found! Clicking Confirm...")
-                confirm_btn.click(force=True)
-                
-                # 3. Smarter Victory Detection
-                print("      🧘 Waiting for server success banner (up to 20s)...")
-                for _ in range(20):
-                    try:
-                        page_text = page.locator("body").inner_text().lower()
-                        if "success" in page_text or "successfully accepted" in page_text or "job number" in page_text:
-                            print("      ✨ SUCCESS! Found confirmation message on page.")
-                            return "WON"
-                    except:
-                        pass
-                    
-                    if not row_element.is_visible():
-                        print("      ✨ SUCCESS! The job row disappeared.")
-                        return "WON"
-                        
-                    time.sleep(1)
-
-                print("      ❌ The job row never disappeared.")
-                return "LOST"
+                await CAPTURE.snapshot(page, "accept-modal")
+
+                # 3. Read the verdict from the server's reply
+                outcome = await confirm_and_classify(page, confirm_btn, row_element)
+                await CAPTURE.snapshot(page, f"accept-{outcome.split(':')[0].lower()}")
+                if outcome == "REVIEW":
+                    last_outcome = outcome
+                    print("      ⏳ Job is Under Review. Retrying loop...")
+                    await asyncio.sleep(1)
+                    continue
+                return outcome
                 
             except Exception as e:
                 print("      ⚠️ Modal blocked (Job likely 'Under Review'). Retrying loop...")
-                time.sleep(1) 
+                await asyncio.sleep(1) 
                 continue
 
         print("      ❌ Max attempts reached. The job is permanently gone or locked.")
-        return "LOST"
+        return last_outcome
 
     except Exception as fatal_error:
         print(f"      🔴 FATAL COMBAT CRASH: {fatal_error}")
         return f"CRASH: {fatal_error}"
 
-def parse_row_to_clean_string(row_element):
-    if not row_element.is_visible(): return None, None, 0
-    text_list = row_element.inner_text().split('\n')
-    clean_items = [item.strip() for item in text_list if item.strip()]
-    clean_items = [x for x in clean_items if x not in ["Decline", "Accept", "Details", "Select"]]
-    if not clean_items: return None, None, 0
-    full_string = " ".join(clean_items)
-    if not re.search(r'\d', full_string): return None, None, 0
-
-    date_match = re.search(r'\d{2}/\d{2}/\d{4}', full_string)
-    date_str = date_match.group(0) if date_match else "Unknown"
+# Watches the page for the accept verdict when no accept reply was seen.
+# Only text that wasn't on the page before Confirm counts, so an old banner
+# can't be mistaken for this job's result.
+ACCEPT_OUTCOME_JS = """
+(row) => {
+    if (row && (!row.isConnected || row.getClientRects().length === 0)) return "WON";
+    const before = window.__sfBeforeConfirm || "";
+    const text = document.body ? document.body.innerText.toLowerCase() : "";
+    if (text === before) return false;
+    const fresh = (phrase) => text.includes(phrase) && !before.includes(phrase);
+    if (fresh("under review")) return "REVIEW";
+    if (fresh("no longer available") || fresh("already been")) return "TAKEN";
+    if (fresh("successfully accepted") || fresh("job number")) return "WON";
+    return false;
+}
+"""
 
-    time_matches = re.findall(r'\d{1,2}:\d{2}\s?[aApP][mM]', full_string)
-    time_display = ""
-    duration = 0.0
+def is_accept_response(response):
+    return response.request.method != "GET" and ACCEPT_API_PATTERN.search(response.url) is not None
 
-    if len(time_matches) >= 2:
+async def confirm_and_classify(page, confirm_btn, row_element):
+    """Clicks Confirm and returns the outcome as soon as the server answers."""
+    started = time.time()
+    await page.evaluate("() => { window.__sfBeforeConfirm = document.body.innerText.toLowerCase(); }")
+    try:
+        async with page.expect_response(is_accept_response, timeout=ACCEPT_RESPONSE_SECONDS * 1000) as reply:
+            await confirm_btn.click(force=True)
+        response = await reply.value
         try:
-            fmt = "%I:%M %p"
-            t1 = datetime.strptime(time_matches[0].strip().upper(), fmt)
-            t2 = datetime.strptime(time_matches[-1].strip().upper(), fmt)
-            
-            duration = (t2 - t1).total_seconds() / 3600.0
-            if duration < 0: 
-                duration += 24.0
-                time_display = f"{time_matches[0].strip()} - {time_matches[-1].strip()}"
-        except:
-            duration = 0.0
-    elif len(time_matches) == 1:
-        time_display = time_matches[0]
-
-    content_items = []
-    for x in clean_items:
-        if date_str in x: continue
-        if x in time_matches: continue
-        if x in ["Wednesday", "Thursday", "Friday", "Monday", "Tuesday", "Saturday", "Sunday"]: continue
-        content_items.append(x)
-
-    formatted_msg = f"📅 {date_str}"
-    if content_items:
-        formatted_msg += f" | 🏫 {content_items[-1]}"
-    if time_display:
-        formatted_msg += f" | ⏰ {time_display}"
-
-    return formatted_msg, date_str, duration
+            body = await response.text()
+        except Exception:
+            body = ""
+        outcome = classify_accept_response(response.status, body)
+        print(f"      📡 Accept reply HTTP {response.status}: {outcome} ({(time.time() - started) * 1000:.0f}ms)")
+        return outcome
+    except PlaywrightTimeoutError:
+        print("      ⚠️ No accept reply seen. Watching the page instead...")
+
+    row = None
+    try:
+        row = await row_element.element_handle(timeout=500)
+    except Exception:
+        pass
+    try:
+        handle = await page.wait_for_function(ACCEPT_OUTCOME_JS, arg=row, polling=100,
+                                              timeout=ACCEPT_PAGE_SECONDS * 1000)
+        outcome = await handle.json_value()
+        print(f"      ✨ Page says {outcome} ({time.time() - started:.1f}s)")
+        return outcome
+    except PlaywrightTimeoutError:
+        print("      ❌ No verdict on the page and the job row never disappeared.")
+        return "LOST"
+
+def parse_row_text(row_text):
+    """(clean_msg, job_date_str, duration, job_key) for a row, or (None, None, 0, None)."""
+    row = parse_row(row_text)
+    if row is None:
+        return None, None, 0, None
+    return row.summary, row.date, row.duration, row.key
+
+# Snapshot of every visible row in one round trip. Each row gets a stable
+# data-sf-row tag so it can be found again later even if other rows vanish.
+EXTRACT_ROWS_JS = """
+() => {
+    window.__sfRowSeq = window.__sfRowSeq || 0;
+    const rows = [];
+    for (const tr of document.querySelectorAll("tr")) {
+        const box = tr.getBoundingClientRect();
+        if (box.width === 0 || box.height === 0 || getComputedStyle(tr).visibility === "hidden") continue;
+        if (!tr.dataset.sfRow) tr.dataset.sfRow = String(++window.__sfRowSeq);
+        rows.push({
+            id: tr.dataset.sfRow,
+            text: tr.innerText,
+            cells: Array.from(tr.cells, cell => cell.innerText.trim()),
+        });
+    }
+    return rows;
+}
+"""
+
+async def extract_rows(page):
+    """Returns [{"id", "text", "cells"}] for every visible table row."""
+    return await page.evaluate(EXTRACT_ROWS_JS)
+
+async def row_locator(page, record):
+    """Finds the live row for an extract_rows record, for attempt_auto_accept."""
+    tagged = page.locator(f'tr[data-sf-row="{record["id"]}"]')
+    if await tagged.count() > 0:
+        return tagged.first
+    # The SPA re-rendered the table; match on the cell contents instead
+    for fresh in await extract_rows(page):
+        if fresh["cells"] == record["cells"]:
+            return page.locator(f'tr[data-sf-row="{fresh["id"]}"]').first
+    return None
+
+async def find_row_in_browser(account, page, job_date_str, duration, clean_msg):
+    """Finds the table row for a job seen in the JSON feed, for attempt_auto_accept."""
+    if await goto_authenticated(account, page, account.profile.available_jobs_url, "available") is None:
+        return None
+    school = clean_msg.split("🏫 ")[-1].split(" |")[0] if "🏫 " in clean_msg else ""
+    fallback = None
+    for record in await extract_rows(page):
+        row_msg, row_date, row_duration, _ = parse_row_text(record["text"])
+        if not row_msg or row_date != job_date_str or abs(row_duration - duration) > 0.01:
+            continue
+        if school and school.upper() in row_msg.upper():
+            return await row_locator(page, record)
+        fallback = fallback or record
+    return await row_locator(page, fallback) if fallback else None
 
 # ==========================================
 # 🚀 MAIN LOOP
 # ==========================================
-def run_check(known_jobs):
-    global LOGIN_FAIL_COUNT, LAST_HEARTBEAT_DATE
-    
+def browser_candidates(rows):
+    candidates = []
+    for record in rows:
+        clean_msg, job_date_str, duration, job_key = parse_row_text(record["text"])
+        candidates.append((clean_msg, job_date_str, duration, job_key, record))
+    return candidates
+
+def log_table(account, row_texts):
+    """Logs one whole table from watch mode as a posting-log scan."""
+    if account.postings is None:
+        return
+    sightings = []
+    for row_text in row_texts:
+        clean_msg, _, duration, job_key = parse_row_text(row_text)
+        if clean_msg:
+            sightings.append((job_key, duration, account.rules.rules.is_target(clean_msg)))
+    account.postings.scan(sightings)
+
+# attempt_auto_accept result -> job store outcome
+ACCEPT_OUTCOMES = {"WON": "won", "TAKEN": "taken", "REVIEW": "review", "LOST": "lost"}
+
+async def fight_on_tab(account, page, tab, job_date_str, duration, clean_msg, row):
+    """Finds the job's row on one tab and fights for it. `tab` None means the scan page."""
+    try:
+        if tab is None:
+            page = page or await SESSION.get_page(account)
+        else:
+            page = await SESSION.get_page(account, tab)
+        if tab is None and row is not None:
+            row_element = await row_locator(page, row)
+        else:
+            row_element = await SUPERVISOR.within(
+                "available", find_row_in_browser(account, page, job_date_str, duration, clean_msg))
+        if row_element is None:
+            return "CRASH: row not found in browser"
+        METRICS.inc("accept_attempts_total", account=account.name)
+        with METRICS.timer("accept", account=account.name):
+            return await SUPERVISOR.within("accept", attempt_auto_accept(page, row_element, clean_msg))
+    except StageTimeout as e:
+        # Whatever the tab is stuck on, it gets replaced on its next use
+        account.crashed.add(tab or "available")
+        return f"CRASH: {e}"
+    except Exception as e:
+        return f"CRASH: {e}"
+
+def settle_fight(account, result, clean_msg, job_date_str, duration, job_key, blocked_dates):
+    outcome = ACCEPT_OUTCOMES.get(result, "crash")
+    METRICS.inc("accept_results_total", account=account.name, result=outcome)
+    if result == "WON":
+        account.push(f"🎉 SECURED JOB ({duration}h):\n{clean_msg}")
+        blocked_dates.add(job_date_str)
+        account.blackout.add(job_date_str)
+        account.blackout.invalidate()
+        account.record(job_key, job_date_str, clean_msg, "won")
+    elif result == "TAKEN":
+        account.push(f"⚠️ TAKEN BY SOMEONE ELSE:\n{clean_msg}")
+        account.record(job_key, job_date_str, clean_msg, "taken")
+    elif result == "REVIEW":
+        account.push(f"⏳ STILL UNDER REVIEW:\n{clean_msg}")
+        account.record(job_key, job_date_str, clean_msg, "review")
+    elif result == "LOST":
+        account.push(f"⚠️ LOST FIGHT FOR:\n{clean_msg}")
+        account.record(job_key, job_date_str, clean_msg, "lost")
+    else:
+        account.push(f"🔴 COMBAT CRASHED:\n{clean_msg}\n{result}")
+        account.record(job_key, job_date_str, clean_msg, "crash")
+
+async def fight_for_jobs(account, page, fights, blocked_dates, now_pst):
+    """Fights for every job in `fights` at once, best score first.
+
+    Each date gets its own tab (up to ACCEPT_MAX_TABS, the scan page being
+    the first), all in the same logged-in context. Jobs on the same date go
+    one after another, and once one is won the rest of that day is skipped.
+    """
+    rules = account.rules.rules
+    fights.sort(key=lambda fight: rules.score(fight[0], fight[1], fight[2], now_pst), reverse=True)
+    by_date = {}
+    for fight in fights:
+        by_date.setdefault(fight[1], []).append(fight)
+
+    tabs = asyncio.Queue()
+    for slot in range(min(ACCEPT_MAX_TABS, len(by_date))):
+        tabs.put_nowait(None if slot == 0 else f"accept-{slot}")
+    if len(fights) > 1:
+        print(f"   ⚔️ {len(fights)} jobs to fight for on {len(by_date)} date(s), {tabs.qsize()} tab(s).")
+
+    async def fight_date(group):
+        for clean_msg, job_date_str, duration, job_key, row in group:
+            if job_date_str in blocked_dates:
+                # Not recorded: the day being taken keeps it out of later scans
+                print(f"   ⏭️ Already working {job_date_str}; skipping: {clean_msg.splitlines()[0]}")
+                continue
+            tab = await tabs.get()
+            try:
+                account.push(f"⚡ COMBAT MODE INITIATED:\n{clean_msg}")
+                result = await fight_on_tab(account, page, tab, job_date_str, duration, clean_msg, row)
+            finally:
+                tabs.put_nowait(tab)
+            settle_fight(account, result, clean_msg, job_date_str, duration, job_key, blocked_dates)
+
+    await asyncio.gather(*(fight_date(group) for group in by_date.values()))
+
+async def process_rows(account, page, candidates, blocked_dates, complete=True):
+    """Applies the rules to parsed rows, fights for the best ones and notifies.
+
+    `candidates` holds (clean_msg, job_date_str, duration, job_key, row) tuples. `row`
+    is the extract_rows record for browser rows, or None for jobs that came
+    from the JSON feed; the browser is only used to look those up if we
+    decide to auto-accept. Only a `complete` set of rows (a whole scan, not a
+    watch-mode batch) is written to the posting log.
+    """
+    job_store = account.job_store
+    new_jobs_found = []
+    seen_keys = []
+    sightings = []
+    fights = []
     now_pst = datetime.utcnow() - timedelta(hours=8)
-    
-    if now_pst.hour == 6 and now_pst.minute < 5:
-        today_str = now_pst.strftime("%Y-%m-%d")
-        if LAST_HEARTBEAT_DATE != today_str:
-            send_push("🟢 Daily Heartbeat: Bot is active and scanning.", title="System Status")
-            LAST_HEARTBEAT_DATE = today_str
+    for clean_msg, job_date_str, duration, job_key, row in candidates:
+        if clean_msg:
+            seen_keys.append(job_key)
+            sightings.append((job_key, duration, account.rules.rules.is_target(clean_msg)))
+            METRICS.inc("rows_parsed_total", account=account.name)
 
-    print(f"[{now_pst.strftime('%I:%M %p')}] 🚀 Scanning SmartFind...")
-    
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=True, 
-            args=[
-                "--no-sandbox", 
-                "--disable-setuid-sandbox", 
-                "--disable-dev-shm-usage", 
-                "--disable-gpu", 
-                "--single-process", 
-                "--no-zygote",
-                "--disable-extensions"
-            ]
-        )
-        context = browser.new_context(viewport={'width': 1920, 'height': 1080})
-        page = context.new_page()
-        page.on("dialog", lambda dialog: dialog.accept())
-        
-        try:
-            page.goto("https://westcontracosta.eschoolsolutions.com/logOnInitAction.do", wait_until="networkidle")
+            action, reason = account.rules.decide(clean_msg, job_date_str, duration, blocked_dates, now_pst)
+            if reason in DATE_REASONS:
+                continue
             
-            login_success = False
+            if job_store.is_known(job_key):
+                continue
+
+            METRICS.inc("decisions_total", account=account.name, action=action, reason=reason)
+            if action == IGNORE:
+                account.record(job_key, job_date_str, clean_msg, "ignored")
+                continue
+
+            if action == NOTIFY:
+                new_jobs_found.append(clean_msg)
+                account.record(job_key, job_date_str, clean_msg, "notified")
+                continue
+
+            fights.append((clean_msg, job_date_str, duration, job_key, row))
+
+    if complete and account.postings is not None:
+        account.postings.scan(sightings)
+
+    if fights:
+        await fight_for_jobs(account, page, fights, blocked_dates, now_pst)
+
+    job_store.touch(seen_keys)
+
+    if new_jobs_found:
+        msg = f"🚨 {len(new_jobs_found)} NEW TARGET JOB(S):\n"
+        for job in new_jobs_found:
+            msg += f"{job}\n"
+        account.push(msg)
+
+async def fetch_feed(account, name, cookies):
+    endpoint = account.feeds.get(name)
+    return await asyncio.to_thread(FEED_CLIENT.get_json, endpoint["url"], cookies, endpoint["headers"])
+
+async def poll_json_feeds(account):
+    """One scan straight from the JSON feeds. Returns False to fall back to the browser."""
+    if not account.feeds.has("available"):
+        print("   🛰️ Jobs feed not recorded yet. Scanning with the browser...")
+        return False
+    cookies = await SESSION.cookies(account)
+    if cookies is None:
+        return False
+
+    try:
+        with METRICS.timer("feed_poll", account=account.name):
+            data = await poll_feeds(account, cookies)
+        if data is None:
+            print("   🔑 Feed session expired. Falling back to the browser...")
+            return False
+        records = find_job_records(data)
+    except (FeedError, OSError) as feed_error:
+        print(f"   ⚠️ Feed poll failed ({feed_error}). Falling back to the browser...")
+        account.feeds.forget("available")
+        return False
+
+    if account.blackout.is_stale() and not account.feeds.has("active"):
+        # No active feed recorded: read the view in its own tab
+        await refresh_blackout(account)
+    blocked_dates = account.blackout.blocked()
+
+    if not records:
+        log_table(account, [])
+        return True
+
+    candidates = []
+    with METRICS.timer("parse", account=account.name):
+        for record in records:
+            clean_msg, job_date_str, duration, job_key = parse_row_text(record_to_row_text(record))
+            if clean_msg:
+                candidates.append((clean_msg, job_date_str, duration, job_key, None))
+
+    with METRICS.timer("process", account=account.name):
+        await process_rows(account, None, candidates, blocked_dates)
+    return True
+
+async def poll_feeds(account, cookies):
+    """The available-jobs feed, plus the active one when the blackout is stale. None if logged out."""
+    if account.feeds.has("active") and account.blackout.is_stale():
+        active_data, data = await asyncio.gather(
+            fetch_feed(account, "active", cookies), fetch_feed(account, "available", cookies)
+        )
+        if active_data is None:
+            return None
+        account.blackout.update(extract_dates(active_data))
+        return data
+    return await fetch_feed(account, "available", cookies)
+
+# ==========================================
+# 👁️ WATCH MODE
+# ==========================================
+# Installed in the available-jobs tab on every page load. A MutationObserver
+# notices rows as the SPA renders them and hands new or changed ones to
+# Python through the __sfRowEvent binding (unchanged rows are re-sent every
+# resendMs, so jobs we lost get retried like a normal scan would). A timer
+# presses the SPA's own refresh control, or fires a hashchange when there is
+# none, unless Python has paused it for an accept. Just before each refresh
+# it also sends the whole table, which is what the posting log records.
+WATCH_JS = """
+(config) => {
+    if (window.__sfWatch) return;
+    window.__sfWatch = true;
+    window.__sfWatchPaused = false;
+    window.__sfRowSeq = window.__sfRowSeq || 0;
+    const DATE = /\\d{2}\\/\\d{2}\\/\\d{4}/;
+    let sent = new Map();
+    let pending = null;
+
+    const onLogin = () => location.href.includes("logOnInitAction") || !!document.querySelector("#userId");
+    const jobRows = () => Array.from(document.querySelectorAll("tr")).filter(tr => {
+        if (!tr.querySelector("td") || !DATE.test(tr.textContent)) return false;
+        const box = tr.getBoundingClientRect();
+        return box.width > 0 && box.height > 0;
+    });
+
+    const collect = () => {
+        pending = null;
+        if (onLogin()) {
+            window.__sfRowEvent({login: true, rows: []});
+            return;
+        }
+        const now = Date.now();
+        if (sent.size > 5000) sent = new Map();
+        const rows = [];
+        for (const tr of jobRows()) {
+            const text = tr.innerText;
+            if (now - (sent.get(text) || 0) < config.resendMs) continue;
+            sent.set(text, now);
+            if (!tr.dataset.sfRow) tr.dataset.sfRow = String(++window.__sfRowSeq);
+            rows.push({id: tr.dataset.sfRow, text, cells: Array.from(tr.cells, cell => cell.innerText.trim())});
+        }
+        if (rows.length) window.__sfRowEvent({login: false, rows});
+    };
+
+    const start = () => {
+        new MutationObserver(() => { pending = pending || setTimeout(collect, 50); })
+            .observe(document.body, {childList: true, subtree: true, characterData: true});
+        collect();
+    };
+    if (document.body) start(); else document.addEventListener("DOMContentLoaded", start);
+
+    setInterval(() => {
+        if (window.__sfWatchPaused) return;
+        // The whole table as it stands before each refresh, for the posting log
+        if (!onLogin()) window.__sfRowEvent({login: false, rows: [], table: jobRows().map(tr => tr.innerText)});
+        const button = document.querySelector(config.refreshSelector);
+        if (button) button.click();
+        else window.dispatchEvent(new HashChangeEvent("hashchange"));
+    }, config.refreshMs);
+}
+"""
+
+async def start_watch(account, page):
+    """Wires the observer and binding into the available tab and opens the view."""
+    config = {
+        "refreshMs": int(WATCH_REFRESH_SECONDS * 1000),
+        "resendMs": int(WATCH_RESEND_SECONDS * 1000),
+        "refreshSelector": WATCH_REFRESH_SELECTOR,
+    }
+    if account.watch_task is not None:
+        account.watch_task.cancel()
+    if account.watch_page is not page:
+        events = asyncio.Queue()
+        await page.expose_binding("__sfRowEvent", lambda source, event: events.put_nowait(event))
+        await page.add_init_script(f"({WATCH_JS})({json.dumps(config)})")
+        account.watch_page = page
+        account.watch_events = events
+    account.watch_task = asyncio.ensure_future(consume_row_events(account, page, account.watch_events))
+    state = await goto_authenticated(account, page, account.profile.available_jobs_url, "available")
+    print(f"   👁️ Watching {account.name} available jobs (refresh every {WATCH_REFRESH_SECONDS:g}s).")
+    return state
+
+async def consume_row_events(account, page, events):
+    """Runs the rules (and auto-accept) on each batch of rows the observer sends."""
+    while not page.is_closed():
+        event = await events.get()
+        async with account.watch_lock:
+            if page.is_closed():
+                break
             try:
-                page.locator("#userId").fill(SF_USERNAME, timeout=2000)
-                page.locator("#userPin").fill(SF_PASSWORD, timeout=2000)
-                page.locator("#userPin").press("Enter")
-                login_success = True
-            except:
-                for frame in page.frames:
-                    try:
-                        frame.locator("#userId").fill(SF_USERNAME, timeout=1000)
-                        frame.locator("#userPin").fill(SF_PASSWORD, timeout=1000)
-                        frame.locator("#userPin").press("Enter")
-                        login_success = True
-                        break
-                    except:
-                        continue
-            
-            if not login_success:
-                LOGIN_FAIL_COUNT += 1
-                if LOGIN_FAIL_COUNT >= 5:
-                    send_push("🔴 CRITICAL: Bot cannot login (5 failures). Check password or site.", title="Login Error")
-                    LOGIN_FAIL_COUNT = 0 
-                return 
+                if event.get("login"):
+                    if await is_login_page(page):
+                        print("   🔑 Watched page fell back to login.")
+                        await goto_authenticated(account, page, account.profile.available_jobs_url, "available")
+                    continue
+                if "table" in event:
+                    log_table(account, event["table"])
+                    continue
+                METRICS.inc("watch_events_total", account=account.name)
+                candidates = browser_candidates(event["rows"])
+                # Hold the in-page refresh so the table stays put while we act on it
+                await page.evaluate("() => { window.__sfWatchPaused = true; }")
+                try:
+                    with METRICS.timer("process", account=account.name):
+                        await process_rows(account, page, candidates, account.blackout.blocked(), complete=False)
+                finally:
+                    if not page.is_closed():
+                        await page.evaluate("() => { window.__sfWatchPaused = false; }")
+            except Exception as e:
+                print(f"   ⚠️ Row event failed: {e}")
 
-            LOGIN_FAIL_COUNT = 0
-            page.wait_for_load_state("networkidle")
-            time.sleep(5) 
+async def watch_tick(account):
+    """A scheduled scan in watch mode: keeps the watcher alive and does the housekeeping."""
+    async with account.watch_lock:
+        try:
+            await SESSION.start_scan(account)
+            page = await SESSION.get_page(account, "available")
+            if account.watch_page is not page or account.watch_task is None or account.watch_task.done():
+                await SUPERVISOR.within("available", start_watch(account, page))
+            if account.blackout.is_stale():
+                await refresh_blackout(account)
+        except StageTimeout:
+            raise
+        except Exception as global_error:
+            print(f"❌ Global Error: {global_error}")
 
-            blocked_dates = get_active_dates(page)
+async def run_check_async(account):
+    """One full scan of `account`, timed and under the scan deadline, with a rolling summary every so often."""
+    SUPERVISOR.scan_started(account.name)
+    missed = False
+    try:
+        with METRICS.timer("scan", account=account.name):
+            await SUPERVISOR.within("scan", scan_account(account))
+    except StageTimeout as e:
+        missed = True
+        METRICS.inc("missed_scans_total", account=account.name, stage=e.stage)
+        print(f"⏰ Scan of {account.name} missed: {e} ({SUPERVISOR.missed_scans + 1} missed so far).")
+        await SESSION.restart(str(e))
+    # Out here rather than in the scan, so a cancelled scan never touches the
+    # browser it timed out on: after a restart there is no browser to check
+    await after_scan(account)
+    if SUPERVISOR.scan_finished(missed):
+        SUPERVISOR.restart_process(f"{SUPERVISOR.missed_in_a_row} scans in a row missed")
+    METRICS.inc("scans_total", account=account.name)
+    if METRICS_SUMMARY_SCANS and METRICS.total("scans_total") % METRICS_SUMMARY_SCANS == 0:
+        print(f"📈 Stage timings (last {METRICS.window} per stage):\n{METRICS.summary()}")
 
-            page.goto("https://westcontracosta.eschoolsolutions.com/ui/#/substitute/jobs/available", wait_until="networkidle")
-            time.sleep(8)
+async def scan_account(account):
+    now_pst = datetime.utcnow() - timedelta(hours=8)
+    
+    if now_pst.hour == 6 and now_pst.minute < 5:
+        today_str = now_pst.strftime("%Y-%m-%d")
+        if account.last_heartbeat_date != today_str:
+            account.push("🟢 Daily Heartbeat: Bot is active and scanning.", title="System Status")
+            account.last_heartbeat_date = today_str
 
-            if "there are no jobs available" in page.locator("body").inner_text().lower():
-                known_jobs.clear()
-                return
+    print(f"[{now_pst.strftime('%I:%M %p')}] 🚀 Scanning SmartFind ({account.name})...")
 
-            new_jobs_found = []
-            current_scan_signatures = set()
-            rows = page.locator("tr").all()
-            
-            for row in rows:
-                clean_msg, job_date_str, duration = parse_row_to_clean_string(row)
-                if clean_msg:
-                    fingerprint = clean_msg
-                    
-                    if job_date_str in blocked_dates:
-                        continue
-                        
-                    try:
-                        job_dt_check = datetime.strptime(job_date_str, "%m/%d/%Y")
-                        if job_dt_check.weekday() == 1:
-                            continue
-                    except:
-                        pass
-                    
-                    if fingerprint in known_jobs:
-                        current_scan_signatures.add(fingerprint)
-                        continue
-
-                    if not is_target_school(clean_msg):
-                        current_scan_signatures.add(fingerprint)
-                        continue
-                        
-                    if duration > AUTO_ACCEPT_MAX_HOURS:
-                        current_scan_signatures.add(fingerprint)
-                        continue
-
-                    accepted = False
-                    fought_and_lost = False 
-                    
-                    if AUTO_ACCEPT_ENABLED:
-                        is_notify_only = job_date_str in NOTIFY_ONLY_DATES
-                        if not is_notify_only:
-                            is_safe_time = check_24h_rule(job_date_str)
-                            is_long_enough = duration >= AUTO_ACCEPT_MIN_HOURS
-                            
-                            if is_long_enough and is_safe_time:
-                                send_push(f"⚡ COMBAT MODE INITIATED:\n{clean_msg}")
-                                
-                                result = attempt_auto_accept(page, row, clean_msg)
-                                
-                                if result == "WON":
-                                    send_push(f"🎉 SECURED JOB ({duration}h):\n{clean_msg}")
-                                    accepted = True
-                                    blocked_dates.add(job_date_str)
-                                elif result == "LOST":
-                                    send_push(f"⚠️ LOST FIGHT FOR:\n{clean_msg}")
-                                    fought_and_lost = True 
-                                else:
-                                    send_push(f"🔴 COMBAT CRASHED:\n{clean_msg}\n{result}")
-                                    fought_and_lost = True
-
-                    if not accepted and not fought_and_lost:
-                        if duration >= NOTIFICATION_MIN_HOURS:
-                            new_jobs_found.append(clean_msg)
-                        current_scan_signatures.add(fingerprint)
-
-            if new_jobs_found:
-                msg = f"🚨 {len(new_jobs_found)} NEW TARGET JOB(S):\n"
-                for job in new_jobs_found:
-                    msg += f"{job}\n"
-                send_push(msg)
-                known_jobs.update(current_scan_signatures)
+    if account.rules.maybe_reload():
+        # Jobs the old rules ignored get a fresh look under the new ones
+        account.job_store.reopen("ignored")
+
+    if POLL_MODE == "watch":
+        await watch_tick(account)
+        return
 
+    if POLL_MODE == "json":
+        try:
+            if await poll_json_feeds(account):
+                return
+        except StageTimeout:
+            raise
         except Exception as global_error:
             print(f"❌ Global Error: {global_error}")
-        finally:
-            browser.close()
+            return
+    
+    try:
+        page = await SUPERVISOR.within("launch", open_scan_page(account))
+    except StageTimeout:
+        raise
+    except Exception as launch_error:
+        print(f"❌ Browser Launch Error: {launch_error}")
+        await SESSION.close()
+        return
 
-if __name__ == "__main__":
-    known_jobs = set()
-    print("🤖 Bot Active. FEATURES: PROVEN-ICON-CLICK | CRASH-REPORTER")
+    available_task = active_task = None
+    try:
+        # The available navigation goes out first; the active view then loads
+        # in its own tab (opening it takes the launch lock) while rows come in
+        available_task = asyncio.ensure_future(load_available(account, page))
+        if account.blackout.is_stale():
+            active_task = asyncio.ensure_future(refresh_blackout(account))
+        state, candidates = await SUPERVISOR.within("available", available_task)
+        if state is None:
+            return
+        if state == "empty":
+            log_table(account, [])  # an empty table is still a complete scan
+            return
+
+        if active_task is not None:
+            # Rows are parsed already; only the decisions need the days we work
+            with METRICS.timer("active_wait", account=account.name):
+                await active_task
+        blocked_dates = account.blackout.blocked()
+        with METRICS.timer("process", account=account.name):
+            await process_rows(account, page, candidates, blocked_dates)
+
+    except StageTimeout:
+        raise
+    except Exception as global_error:
+        print(f"❌ Global Error: {global_error}")
+    finally:
+        for task in (available_task, active_task):
+            if task is not None and not task.done():
+                task.cancel()
+
+async def open_scan_page(account):
+    await SESSION.start_scan(account)
+    return await SESSION.get_page(account, "available")
+
+async def load_available(account, page):
+    """Opens the available view and parses its rows the moment they land. Returns (state, candidates)."""
+    state = await goto_authenticated(account, page, account.profile.available_jobs_url, "available")
+    if state is None or state == "empty":
+        return state, []
+    with METRICS.timer("parse", account=account.name):
+        return state, browser_candidates(await extract_rows(page))
+
+async def refresh_blackout(account):
+    """Reads the active-jobs view in its own tab and updates the blackout dates."""
+    try:
+        page = await SESSION.get_page(account, "active")
+    except Exception as e:
+        print(f"   ⚠️ Could not open the active jobs tab: {e}")
+        return
+    active_dates = await get_active_dates(account, page)
+    if active_dates is not None:
+        account.blackout.update(active_dates)
+
+async def after_scan(account):
+    """Housekeeping between scans: store maintenance and the memory watchdog."""
+    account.job_store.maintain()
+    try:
+        await SESSION.end_scan(account)
+    except Exception as e:
+        print(f"   ⚠️ Memory check failed: {e}")
+
+_LOOP = None
+
+def get_loop():
+    """The bot's one event loop. The browser session lives on it between scans."""
+    global _LOOP
+    if _LOOP is None:
+        _LOOP = asyncio.new_event_loop()
+    return _LOOP
+
+def run_check(account):
+    """Sync entry point: runs one scan of `account` on the bot's event loop."""
+    return get_loop().run_until_complete(run_check_async(account))
+
+def build_scheduler(account):
+    profile_source = None
+    if LEARN_POLL_PROFILE:
+        # The posting log keeps history the job store prunes, so prefer it
+        history = account.postings if account.postings is not None else account.job_store
+        profile_source = lambda: history.first_seen_times(time.time() - 90 * 86400)
+    return PollScheduler(
+        parse_windows(account.profile.poll_windows),
+        jitter=POLL_JITTER,
+        # JSON polls are cheap, so the same windows run proportionally faster
+        scale=(JSON_POLL_SECONDS / 60 if POLL_MODE == "json" else 1.0) / REPLAY_SPEED,
+        min_interval=5.0 / REPLAY_SPEED,
+        profile_source=profile_source,
+    )
+
+async def main(accounts):
+    """Scans every account on its own schedule, earliest deadline first.
+
+    Scans run one at a time on the shared browser, so when they can't all
+    keep up, the account that has waited longest always goes next.
+    """
+    schedulers = {account.name: build_scheduler(account) for account in accounts}
+    for scheduler in schedulers.values():
+        scheduler.start()
     while True:
-        run_check(known_jobs)
-        time.sleep(60)
\ No newline at end of file
+        account = min(accounts, key=lambda account: schedulers[account.name].deadline)
+        await asyncio.sleep(max(0.0, schedulers[account.name].deadline - time.time()))
+        await run_check_async(account)
+        schedulers[account.name].next_delay()
+
+if __name__ == "__main__":
+    accounts = load_accounts()
+    if METRICS_PORT:
+        try:
+            METRICS.serve(METRICS_PORT, METRICS_HOST)
+            print(f"📈 Metrics on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+        except OSError as e:
+            print(f"⚠️ Metrics endpoint not started: {e}")
+    print(f"🤖 Bot Active ({', '.join(account.name for account in accounts)}). "
+          "FEATURES: PROVEN-ICON-CLICK | CRASH-REPORTER")
+    if SUPERVISOR.process_restarts:
+        for account in accounts:
+            account.push(f"🔁 Bot restarted itself after stalled scans "
+                         f"({SUPERVISOR.process_restarts} restart(s) so far).", title="System Status")
+    SUPERVISOR.start()
+    try:
+        get_loop().run_until_complete(main(accounts))
+    finally:
+        get_loop().run_until_complete(SESSION.close())
+        for account in accounts:
+            account.close()
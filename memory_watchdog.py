@@ -0,0 +1,102 @@
+"""
+Memory watchdog for the long-running bot.
+
+After each scan it samples the RSS of this Python process and of every
+process it spawned (the Playwright driver and Chromium), straight from
+/proc. It then says whether the browser session should be recycled:
+
+  "context"  drop the browser context (and its renderer) but keep Chromium
+  "browser"  relaunch Chromium and the Playwright driver from scratch
+
+Context recycles are cheap, so they happen first: at the soft limit or
+every `context_every` scans. The hard limits (browser or Python) ask for a
+full relaunch. A limit of 0 turns that check off.
+"""
+import os
+
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return 0.0
+
+
+def child_pids(root_pid):
+    """Every descendant of root_pid (Chromium and its helpers)."""
+    parents = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return []
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            parents.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError):
+            continue
+    found, stack = [], [root_pid]
+    while stack:
+        for child in parents.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+class MemoryWatchdog:
+    def __init__(self, context_limit_mb=0, browser_limit_mb=0, python_limit_mb=0, context_every=0):
+        self.context_limit_mb = context_limit_mb
+        self.browser_limit_mb = browser_limit_mb
+        self.python_limit_mb = python_limit_mb
+        self.context_every = context_every
+
+        self.python_mb = 0.0
+        self.browser_mb = 0.0
+        self.peak_python_mb = 0.0
+        self.peak_browser_mb = 0.0
+        self.recycles = {"context": 0, "browser": 0}
+
+    def sample(self):
+        """Reads current RSS. Returns (python_mb, browser_mb)."""
+        pid = os.getpid()
+        self.python_mb = rss_mb(pid)
+        self.browser_mb = sum(rss_mb(child) for child in child_pids(pid))
+        self.peak_python_mb = max(self.peak_python_mb, self.python_mb)
+        self.peak_browser_mb = max(self.peak_browser_mb, self.browser_mb)
+        return self.python_mb, self.browser_mb
+
+    def verdict(self, python_mb, browser_mb, context_scans):
+        """(action, reason) for these readings; action is None, "context" or "browser"."""
+        if self.browser_limit_mb and browser_mb >= self.browser_limit_mb:
+            return "browser", f"browser at {browser_mb:.0f}MB (limit {self.browser_limit_mb}MB)"
+        if self.python_limit_mb and python_mb >= self.python_limit_mb:
+            return "browser", f"python at {python_mb:.0f}MB (limit {self.python_limit_mb}MB)"
+        if self.context_limit_mb and browser_mb >= self.context_limit_mb:
+            return "context", f"browser at {browser_mb:.0f}MB (soft limit {self.context_limit_mb}MB)"
+        if self.context_every and context_scans >= self.context_every:
+            return "context", f"{context_scans} scans on this context"
+        return None, None
+
+    def check(self, context_scans):
+        """Samples and returns the verdict, counting the recycle it asks for."""
+        action, reason = self.verdict(*self.sample(), context_scans)
+        if action:
+            self.recycles[action] += 1
+        return action, reason
+
+    def stats(self):
+        return {
+            "python_mb": round(self.python_mb, 1),
+            "browser_mb": round(self.browser_mb, 1),
+            "peak_python_mb": round(self.peak_python_mb, 1),
+            "peak_browser_mb": round(self.peak_browser_mb, 1),
+            "context_recycles": self.recycles["context"],
+            "browser_recycles": self.recycles["browser"],
+        }
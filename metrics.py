@@ -0,0 +1,196 @@
+"""
+Scan metrics: per-stage timers, counters, and a local Prometheus endpoint.
+
+Stages are timed with `timer()`:
+
+    with METRICS.timer("login", account="default"):
+        ...
+
+Each stage feeds a latency histogram (for Prometheus) and a rolling window
+of its most recent timings (for summary()). Counters are plain named
+totals with labels. Gauges come from sources that are read when the
+metrics are scraped, e.g. the memory watchdog's stats().
+
+serve() starts a small HTTP server on a daemon thread:
+
+    /metrics   Prometheus text format
+    /summary   the rolling per-stage summary as plain text
+"""
+import http.server
+import threading
+import time
+from collections import deque
+
+PREFIX = "smartfind_"
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    parts = ",".join(f'{key}="{str(value).replace(chr(34), "")}"' for key, value in labels)
+    return "{" + parts + "}"
+
+
+class _Histogram:
+    def __init__(self, window):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        index = 0
+        while index < len(BUCKETS) and seconds > BUCKETS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.total += seconds
+        self.count += 1
+        self.recent.append(seconds)
+
+
+class _Timer:
+    def __init__(self, metrics, stage, labels):
+        self.metrics = metrics
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.stage, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class Metrics:
+    def __init__(self, window=200):
+        self.window = window
+        self.counters = {}    # (name, labels) -> value
+        self.histograms = {}  # (stage, labels) -> _Histogram
+        self.sources = {}     # (name, labels) -> callable returning {key: number}
+        self.lock = threading.Lock()
+        self.server = None
+
+    # ==========================================
+    # 📝 RECORDING
+    # ==========================================
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, stage, seconds, **labels):
+        key = (stage, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = _Histogram(self.window)
+            histogram.observe(seconds)
+
+    def timer(self, stage, **labels):
+        """Context manager that records how long its block took under `stage`."""
+        return _Timer(self, stage, labels)
+
+    def register(self, name, source, **labels):
+        """Adds gauges read from `source()` (a dict of numbers) at scrape time."""
+        self.sources[(name, tuple(sorted(labels.items())))] = source
+
+    def count(self, name, **labels):
+        with self.lock:
+            return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def total(self, name):
+        """A counter summed over all its labels."""
+        with self.lock:
+            return sum(value for (counter, _), value in self.counters.items() if counter == name)
+
+    # ==========================================
+    # 📤 REPORTING
+    # ==========================================
+    def render(self):
+        """Everything in Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+            snapshot = [(key, list(h.counts), h.total, h.count) for key, h in histograms]
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                seen.add(name)
+            lines.append(f"{PREFIX}{name}{_label_text(labels)} {value}")
+
+        if snapshot:
+            lines.append(f"# TYPE {PREFIX}stage_seconds histogram")
+        for (stage, labels), counts, total, count in snapshot:
+            base = (("stage", stage),) + labels
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += bucket_count
+                lines.append(f"{PREFIX}stage_seconds_bucket{_label_text(base + (('le', bound),))} {cumulative}")
+            lines.append(f"{PREFIX}stage_seconds_sum{_label_text(base)} {total:.6f}")
+            lines.append(f"{PREFIX}stage_seconds_count{_label_text(base)} {count}")
+
+        gauges = {}  # metric -> [(labels, value)], so each metric's samples stay together
+        for (name, labels), source in sorted(self.sources.items(), key=lambda item: item[0]):
+            try:
+                values = source()
+            except Exception as e:
+                lines.append(f"# {name}{_label_text(labels)} unavailable: {e}")
+                continue
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges.setdefault(f"{name}_{key}", []).append((labels, value))
+        for metric, samples in sorted(gauges.items()):
+            lines.append(f"# TYPE {PREFIX}{metric} gauge")
+            for labels, value in samples:
+                lines.append(f"{PREFIX}{metric}{_label_text(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """p50/p90/max of each stage over its last `window` timings."""
+        with self.lock:
+            rows = [(stage, labels, sorted(h.recent)) for (stage, labels), h in sorted(self.histograms.items())]
+        lines = []
+        for stage, labels, values in rows:
+            if not values:
+                continue
+            name = stage + "".join(f" {value}" for key, value in labels)
+            p50 = values[len(values) // 2]
+            p90 = values[min(len(values) - 1, int(len(values) * 0.9))]
+            lines.append(f"  {name:<28} n={len(values):<4} p50={p50:6.2f}s p90={p90:6.2f}s max={values[-1]:6.2f}s")
+        return "\n".join(lines)
+
+    # ==========================================
+    # 🌐 ENDPOINT
+    # ==========================================
+    def serve(self, port, host="127.0.0.1"):
+        """Starts the /metrics endpoint on a daemon thread."""
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, kind = metrics.render(), "text/plain; version=0.0.4"
+                elif self.path == "/summary":
+                    body, kind = metrics.summary() + "\n", "text/plain"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True).start()
+        return self.server
@@ -0,0 +1,182 @@
+"""
+Background Pushover dispatcher.
+
+send() drops the message on a bounded queue and returns immediately. One
+worker thread owns a single keep-alive HTTPS connection to Pushover, merges
+bursts of messages into one push, and retries failures with backoff.
+
+Point `api_url` at a local HTTP server (e.g. "http://127.0.0.1:8081") to
+test without sending real pushes.
+"""
+import http.client
+import queue
+import ssl
+import threading
+import time
+import urllib.parse
+
+PUSHOVER_LIMIT = 1024  # max message length Pushover accepts
+
+
+class PushDispatcher:
+    def __init__(self, token, user, api_url="https://api.pushover.net",
+                 max_queue=100, max_retries=4, backoff=1.0, coalesce_window=0.5, timeout=10):
+        parts = urllib.parse.urlsplit(api_url)
+        self.token = token
+        self.user = user
+        self.scheme = parts.scheme or "https"
+        self.netloc = parts.netloc
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.coalesce_window = coalesce_window
+        self.timeout = timeout
+
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._conn = None
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+    # ==========================================
+    # 📥 PUBLIC API
+    # ==========================================
+    def send(self, message, title="SmartFind Bot"):
+        """Queues a push and returns at once. Never raises."""
+        self._ensure_worker()
+        item = (title, message)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Keep the newest news: drop the oldest queued message
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+
+    def flush(self, timeout=10):
+        """Waits (up to `timeout` seconds) for queued pushes to go out."""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.05)
+        return self._queue.unfinished_tasks == 0
+
+    def stats(self):
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "queued": self._queue.qsize(),
+        }
+
+    # ==========================================
+    # 🧵 WORKER
+    # ==========================================
+    def _ensure_worker(self):
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="push-dispatcher", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Anything else that lands within the window rides along
+            deadline = time.time() + self.coalesce_window
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                for title, message in self._coalesce(batch):
+                    self._deliver(title, message)
+            except Exception as e:
+                print(f"   ⚠️ Push dispatcher error: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _coalesce(self, batch):
+        """Merges same-title messages, split to fit Pushover's length limit."""
+        grouped = {}
+        for title, message in batch:
+            grouped.setdefault(title, []).append(message)
+        for title, messages in grouped.items():
+            self.coalesced += len(messages) - 1
+            chunk = ""
+            for message in messages:
+                message = message[:PUSHOVER_LIMIT]
+                if chunk and len(chunk) + 2 + len(message) > PUSHOVER_LIMIT:
+                    yield title, chunk
+                    chunk = ""
+                chunk = f"{chunk}\n\n{message}" if chunk else message
+            if chunk:
+                yield title, chunk
+
+    def _deliver(self, title, message):
+        payload = urllib.parse.urlencode({
+            "token": self.token,
+            "user": self.user,
+            "message": message,
+            "title": title
+        })
+        headers = {"Content-type": "application/x-www-form-urlencoded", "Connection": "keep-alive"}
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff * (2 ** (attempt - 1)))
+            try:
+                conn = self._connection()
+                conn.request("POST", "/1/messages.json", payload, headers)
+                response = conn.getresponse()
+                body = response.read()
+                if response.will_close:
+                    self._reset()
+            except (http.client.HTTPException, OSError) as e:
+                print(f"   ⚠️ Push attempt {attempt + 1} failed: {e}")
+                self._reset()
+                continue
+
+            if response.status == 200:
+                self.sent += 1
+                return True
+            if response.status == 429 or response.status >= 500:
+                print(f"   ⚠️ Push attempt {attempt + 1} got HTTP {response.status}")
+                continue
+            # 4xx: bad token/user or payload. Retrying won't help.
+            print(f"   ❌ Push rejected: {response.status} {body[:200]!r}")
+            self.failed += 1
+            return False
+
+        print("   ❌ Push gave up after retries.")
+        self.failed += 1
+        return False
+
+    def _connection(self):
+        if self._conn is None:
+            if self.scheme == "https":
+                context = ssl._create_unverified_context()
+                self._conn = http.client.HTTPSConnection(self.netloc, timeout=self.timeout, context=context)
+            else:
+                self._conn = http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+        return self._conn
+
+    def _reset(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
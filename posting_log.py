@@ -0,0 +1,297 @@
+"""
+Append-only history of every job row the bot has seen, scan by scan.
+
+The job store only remembers what we decided about a job. This log keeps
+when each posting showed up and for how long it stayed listed, so that
+questions like "when does El Cerrito usually post?" or "how fast do 6-hour
+jobs go?" can be answered from months of scans.
+
+Each segment is a tab-separated text file. A job is written out once per
+segment and after that it is just a small number:
+
+    J  <id>  <job_key>  <duration>  <target 0/1>     a job's first row in this segment
+    S  <ts>  <id>,<id>,...                           one scan and every job it listed
+    O  <ts>  <job_key>  <outcome>                    what the bot decided about a job
+
+Date and school come from the job key. A new segment starts every
+`segment_hours` and on every restart. Closed segments are gzipped, so a
+month of minute-by-minute scans takes a few megabytes.
+
+    python posting_log.py hours --school "EL CERRITO"
+    python posting_log.py lifetimes --since 90
+    python posting_log.py export postings.csv.gz
+"""
+import argparse
+import csv
+import glob
+import gzip
+import os
+import shutil
+import time
+
+from scheduler import DAYS, pst
+
+HEADER = "# smartfind posting log v1\n"
+
+
+class PostingLog:
+    def __init__(self, directory="postings", segment_hours=24):
+        self.directory = directory
+        self.segment_seconds = segment_hours * 3600
+        self.file = None
+        self.path = None
+        self.opened_at = 0.0
+        self.ids = {}  # job_key -> id within the current segment
+        self.scans = 0
+        self.segments = 0
+        os.makedirs(directory, exist_ok=True)
+        # Segments left open by an earlier run are finished now
+        for path in sorted(glob.glob(os.path.join(directory, "*.log"))):
+            _compress(path)
+
+    def _rotate(self, now):
+        if self.file is not None:
+            self.file.close()
+            _compress(self.path)
+        self.path = os.path.join(self.directory, time.strftime("%Y%m%d-%H%M%S", time.gmtime(now)) + ".log")
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.file.write(HEADER)
+        self.opened_at = now
+        self.ids = {}
+        self.segments += 1
+
+    def _open(self, now):
+        if self.file is None or now - self.opened_at >= self.segment_seconds:
+            self._rotate(now)
+
+    def scan(self, rows, now=None):
+        """Logs one scan. `rows` holds (job_key, duration, target) for every row it listed."""
+        now = now or time.time()
+        self._open(now)
+        lines = []
+        ids = []
+        for job_key, duration, target in rows:
+            job_id = self.ids.get(job_key)
+            if job_id is None:
+                job_id = self.ids[job_key] = len(self.ids)
+                lines.append(f"J\t{job_id}\t{job_key}\t{duration:g}\t{1 if target else 0}\n")
+            ids.append(str(job_id))
+        lines.append(f"S\t{now:.0f}\t{','.join(ids)}\n")
+        self.file.write("".join(lines))
+        self.file.flush()
+        self.scans += 1
+
+    def outcome(self, job_key, outcome, now=None):
+        now = now or time.time()
+        self._open(now)
+        self.file.write(f"O\t{now:.0f}\t{job_key}\t{outcome}\n")
+        self.file.flush()
+
+    def first_seen_times(self, since):
+        """When each job in the log was first listed, for the scheduler's posting profile."""
+        if self.file is not None:
+            self.file.flush()
+        jobs, _ = load_history(self.directory, since)
+        return [job.first_seen for job in jobs.values()]
+
+    def stats(self):
+        return {"scans": self.scans, "segments": self.segments, "jobs_in_segment": len(self.ids)}
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def _compress(path):
+    with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(path)
+
+
+# ==========================================
+# 📖 READING
+# ==========================================
+class JobHistory:
+    __slots__ = ("job_key", "duration", "target", "first_seen", "last_seen", "scans", "outcome")
+
+    def __init__(self, job_key, duration, target, seen_at):
+        self.job_key = job_key
+        self.duration = duration
+        self.target = target
+        self.first_seen = seen_at
+        self.last_seen = seen_at
+        self.scans = 0
+        self.outcome = ""
+
+    @property
+    def date(self):
+        return self.job_key.split("|")[0]
+
+    @property
+    def school(self):
+        return self.job_key.split("|")[1]
+
+    @property
+    def lifetime(self):
+        return self.last_seen - self.first_seen
+
+
+def segment_paths(directory):
+    """Every segment, oldest first (names are start times)."""
+    paths = glob.glob(os.path.join(directory, "*.log.gz")) + glob.glob(os.path.join(directory, "*.log"))
+    return sorted(paths, key=os.path.basename)
+
+
+def _open_segment(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def read_segment(path):
+    """Yields ("scan", ts, [(job_key, duration, target)]) and ("outcome", ts, job_key, outcome)."""
+    jobs = {}
+    try:
+        with _open_segment(path) as f:
+            for line in f:
+                kind, _, rest = line.rstrip("\n").partition("\t")
+                fields = rest.split("\t")
+                try:
+                    if kind == "S":
+                        ids = fields[1].split(",") if len(fields) > 1 and fields[1] else []
+                        yield "scan", float(fields[0]), [jobs[job_id] for job_id in ids]
+                    elif kind == "J":
+                        jobs[fields[0]] = (fields[1], float(fields[2]), fields[3] == "1")
+                    elif kind == "O":
+                        yield "outcome", float(fields[0]), fields[1], fields[2]
+                except (IndexError, KeyError, ValueError):
+                    continue  # a line cut short by a crash
+    except (OSError, EOFError) as e:
+        print(f"   ⚠️ Stopped reading {path} early: {e}")
+
+
+def load_history(directory, since=None):
+    """({job_key: JobHistory}, last scan time) for every job listed at or after `since`."""
+    jobs = {}
+    # A new job's outcome is logged before the scan that listed it, so hold on
+    # to outcomes until their job turns up
+    early_outcomes = {}
+    last_scan = 0.0
+    for path in segment_paths(directory):
+        for event in read_segment(path):
+            if event[0] == "outcome":
+                job = jobs.get(event[2])
+                if job is not None:
+                    job.outcome = event[3]
+                else:
+                    early_outcomes[event[2]] = event[3]
+                continue
+            _, ts, rows = event
+            if since is not None and ts < since:
+                continue
+            last_scan = max(last_scan, ts)
+            for job_key, duration, target in rows:
+                job = jobs.get(job_key)
+                if job is None:
+                    job = jobs[job_key] = JobHistory(job_key, duration, target, ts)
+                    job.outcome = early_outcomes.pop(job_key, "")
+                job.last_seen = ts
+                job.scans += 1
+    return jobs, last_scan
+
+
+# ==========================================
+# 🧮 QUERIES
+# ==========================================
+def select(jobs, school=None, targets_only=False):
+    school = school.upper() if school else None
+    return [
+        job for job in jobs.values()
+        if (not targets_only or job.target) and (school is None or school in job.school)
+    ]
+
+
+def bar(count, peak, width=40):
+    return "█" * (round(count / peak * width) if peak else 0)
+
+
+def print_hours(jobs):
+    """Histogram of first-seen times by PST hour, then by weekday."""
+    hours = [0] * 24
+    weekdays = [0] * 7
+    for job in jobs:
+        when = pst(job.first_seen)
+        hours[when.hour] += 1
+        weekdays[when.weekday()] += 1
+    print(f"📈 {len(jobs)} postings by hour first seen (PST)")
+    for hour, count in enumerate(hours):
+        print(f"  {hour:02d}:00 {count:>6} {bar(count, max(hours))}")
+    print("   by weekday")
+    for day, count in enumerate(weekdays):
+        print(f"  {DAYS[day]:<5} {count:>6} {bar(count, max(weekdays))}")
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def print_lifetimes(jobs, last_scan):
+    """How long jobs stayed listed, by shift length. Jobs still listed in the last scan are left out."""
+    groups = {}
+    still_listed = 0
+    for job in jobs:
+        if job.last_seen >= last_scan:
+            still_listed += 1
+            continue
+        groups.setdefault(round(job.duration), []).append(job.lifetime / 60.0)
+    print(f"⏳ Minutes listed, by shift length ({still_listed} jobs still listed left out)")
+    print(f"  {'hours':>5} {'n':>6} {'p10':>8} {'p50':>8} {'p90':>8}")
+    for hours in sorted(groups):
+        values = sorted(groups[hours])
+        print(f"  {hours:>5} {len(values):>6} {percentile(values, 0.1):8.1f} "
+              f"{percentile(values, 0.5):8.1f} {percentile(values, 0.9):8.1f}")
+
+
+def export_csv(jobs, path):
+    """One row per job, gzipped if `path` ends in .gz."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["job_key", "date", "school", "duration", "target",
+                         "first_seen", "last_seen", "minutes_listed", "scans", "outcome"])
+        for job in sorted(jobs, key=lambda job: job.first_seen):
+            writer.writerow([job.job_key, job.date, job.school, f"{job.duration:g}", int(job.target),
+                             f"{job.first_seen:.0f}", f"{job.last_seen:.0f}", f"{job.lifetime / 60.0:.1f}",
+                             job.scans, job.outcome])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the posting log")
+    parser.add_argument("command", choices=["hours", "lifetimes", "export"])
+    parser.add_argument("output", nargs="?", help="file to export to (.csv or .csv.gz)")
+    parser.add_argument("--dir", default=os.getenv("POSTING_LOG_DIR", "postings"))
+    parser.add_argument("--since", type=float, default=None, help="only the last N days")
+    parser.add_argument("--school", default=None, help="only schools containing this text")
+    parser.add_argument("--targets", action="store_true", help="only jobs the rules wanted")
+    args = parser.parse_args()
+
+    started = time.time()
+    since = started - args.since * 86400 if args.since else None
+    history, last_scan = load_history(args.dir, since)
+    jobs = select(history, args.school, args.targets)
+    print(f"📚 {len(history)} jobs read from {args.dir} in {time.time() - started:.2f}s")
+
+    if args.command == "hours":
+        print_hours(jobs)
+    elif args.command == "lifetimes":
+        print_lifetimes(jobs, last_scan)
+    else:
+        if not args.output:
+            parser.error("export needs an output file")
+        export_csv(jobs, args.output)
+        print(f"💾 Wrote {len(jobs)} jobs to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Account profiles: which SmartFind logins the bot runs, and where.
+
+Without a profiles file the bot runs a single profile built from the usual
+environment settings (SF_BASE_URL, SF_USERNAME, ...). With one, every
+[[profile]] table is a separate account. Whatever a profile leaves out
+comes from those same environment settings, and any key ending in "_env"
+names an environment variable to read the value from, so secrets can stay
+out of the file:
+
+    [[profile]]
+    name = "wccusd"
+    base_url = "https://westcontracosta.eschoolsolutions.com"
+    username_env = "WCCUSD_USERNAME"
+    password_env = "WCCUSD_PASSWORD"
+    rules = "rules-wccusd.toml"
+
+Per-profile files sit next to the configured defaults, with the profile
+name added: JOB_STORE_PATH=/data/jobs.db gives /data/jobs-wccusd.db.
+
+Each profile also keeps its login cookies in its own session file
+(session-<name>.json unless `session_state` says otherwise; an empty
+SESSION_STATE_PATH still turns this off for every profile), and its posting
+history in postings-<name>/.
+"""
+import os
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+
+class Profile:
+    def __init__(self, name="default", base_url=None, username=None, password=None,
+                 pushover_user=None, pushover_token=None, rules="rules.toml", job_store="jobs.db",
+                 session_state="session.json", posting_log="postings", poll_windows=None,
+                 available_api=None, active_api=None):
+        self.name = name
+        self.base_url = (base_url or "").rstrip("/")
+        self.username = username
+        self.password = password
+        self.pushover_user = pushover_user
+        self.pushover_token = pushover_token
+        self.rules = rules
+        self.job_store = job_store
+        self.session_state = session_state
+        self.posting_log = posting_log
+        self.poll_windows = poll_windows
+        self.available_api = available_api
+        self.active_api = active_api
+
+    @property
+    def login_url(self):
+        return f"{self.base_url}/logOnInitAction.do"
+
+    @property
+    def active_jobs_url(self):
+        return f"{self.base_url}/ui/#/substitute/jobs/active"
+
+    @property
+    def available_jobs_url(self):
+        return f"{self.base_url}/ui/#/substitute/jobs/available"
+
+
+def per_profile_path(path, name):
+    """`path` with -<name> before its extension, so profiles sharing a directory don't collide."""
+    if not path or path == ":memory:":
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}-{name}{ext}"
+
+
+def load_profiles(path, defaults):
+    """Profiles from the TOML file at `path`, or one profile from `defaults` if there is no file."""
+    if not path or not os.path.exists(path):
+        return [Profile(**defaults)]
+
+    with open(path, "rb") as f:
+        entries = tomllib.load(f).get("profile", [])
+    if not entries:
+        raise ValueError(f"{path} has no [[profile]] tables")
+
+    profiles = []
+    for entry in entries:
+        name = entry.get("name")
+        if not name:
+            raise ValueError(f"{path}: every profile needs a name")
+        if any(profile.name == name for profile in profiles):
+            raise ValueError(f"{path}: duplicate profile name {name!r}")
+        settings = dict(defaults, job_store=per_profile_path(defaults.get("job_store") or "jobs.db", name),
+                        session_state=per_profile_path(defaults.get("session_state", "session.json"), name))
+        if defaults.get("posting_log"):
+            settings["posting_log"] = f"{defaults['posting_log']}-{name}"
+        for key, value in entry.items():
+            if key.endswith("_env"):
+                settings[key[:-4]] = os.getenv(value)
+            else:
+                settings[key] = value
+        try:
+            profiles.append(Profile(**settings))
+        except TypeError as e:
+            raise ValueError(f"{path}: profile {name!r}: {e}")
+    return profiles
@@ -0,0 +1,121 @@
+"""
+Request filter for the Chromium context.
+
+The bot only reads table text and clicks one icon, so most of what the
+SmartFind SPA pulls in (pictures, web fonts, video, analytics beacons) is
+wasted bandwidth and renderer memory. Two mechanisms keep them out:
+
+  - blocked hosts never resolve (host_resolver_rules, a Chromium launch
+    flag), so those requests fail inside the browser with no Python at all;
+  - RequestFilter.handle is installed as a context route for url_pattern()
+    only, the URLs that look like a blocked type (by file extension).
+    Everything else is never intercepted, so the SPA's scripts, styles and
+    XHRs keep the HTTP cache and skip the round trip through Python.
+
+URLs matching the allow pattern always load, whatever their type. The
+default covers the Accept icon and the confirm dialog's assets, so the
+accept flow looks exactly as it does in a normal browser.
+
+Aborted requests never report a size, so bytes saved is an estimate from
+typical sizes per resource type.
+"""
+import re
+import urllib.parse
+
+# Rough size of one response of each type, for the bytes-saved estimate
+TYPICAL_BYTES = {
+    "image": 25_000,
+    "media": 400_000,
+    "font": 60_000,
+    "stylesheet": 40_000,
+    "script": 120_000,
+}
+OTHER_BYTES = 5_000
+
+NEVER_BLOCKED = ("document",)  # blocking the page itself would break navigation
+
+# File extensions each resource type is routed by
+TYPE_EXTENSIONS = {
+    "image": ("png", "jpe?g", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "media": ("mp4", "webm", "ogg", "mp3", "m4a", "wav", "mov"),
+    "font": ("woff2?", "ttf", "otf", "eot"),
+    "stylesheet": ("css",),
+    "script": ("js",),
+}
+
+
+def host_resolver_rules(hosts):
+    """The --host-resolver-rules launch flag that makes `hosts` (and their subdomains) unreachable."""
+    rules = []
+    for host in hosts:
+        host = host.strip().lower().lstrip(".")
+        if host:
+            rules += [f"MAP {host} ~NOTFOUND", f"MAP *.{host} ~NOTFOUND"]
+    return f"--host-resolver-rules={', '.join(rules)}" if rules else None
+
+
+class RequestFilter:
+    def __init__(self, block_types=(), block_hosts=(), allow=None):
+        self.block_types = frozenset(t.strip().lower() for t in block_types if t.strip()) - set(NEVER_BLOCKED)
+        self.block_hosts = frozenset(h.strip().lower().lstrip(".") for h in block_hosts if h.strip())
+        self.allow = re.compile(allow, re.I) if allow else None
+
+        self.allowed = 0
+        self.blocked = {}  # resource type -> requests aborted
+        self.bytes_saved = 0
+
+    def _blocked_host(self, url):
+        host = urllib.parse.urlsplit(url).hostname or ""
+        labels = host.split(".")
+        # "www.google-analytics.com" is blocked by "google-analytics.com"
+        return any(".".join(labels[i:]) in self.block_hosts for i in range(len(labels)))
+
+    def url_pattern(self):
+        """Regex for the URLs worth routing through handle, or None if no type is blocked."""
+        extensions = [ext for kind in sorted(self.block_types) for ext in TYPE_EXTENSIONS.get(kind, ())]
+        if not extensions:
+            return None
+        return re.compile(r"^[^?#]*\.(?:" + "|".join(extensions) + r")(?:[?#]|$)", re.I)
+
+    def verdict(self, url, resource_type):
+        """Why this request should be aborted ("type" or "host"), or None to let it load."""
+        if resource_type in NEVER_BLOCKED:
+            return None
+        if self.allow is not None and self.allow.search(url):
+            return None
+        if resource_type in self.block_types:
+            return "type"
+        if self.block_hosts and self._blocked_host(url):
+            return "host"
+        return None
+
+    async def handle(self, route):
+        request = route.request
+        if self.verdict(request.url, request.resource_type) is None:
+            self.allowed += 1
+            await route.fallback()
+            return
+        kind = request.resource_type
+        self.blocked[kind] = self.blocked.get(kind, 0) + 1
+        self.bytes_saved += TYPICAL_BYTES.get(kind, OTHER_BYTES)
+        try:
+            await route.abort("blockedbyclient")
+        except Exception:
+            pass  # the page navigated away first
+
+    def stats(self):
+        return {
+            "allowed": self.allowed,
+            "blocked": sum(self.blocked.values()),
+            "blocked_by_type": dict(self.blocked),
+            "est_bytes_saved": self.bytes_saved,
+        }
+
+    def summary(self):
+        blocked = sum(self.blocked.values())
+        total = blocked + self.allowed
+        if not total:
+            return "no requests seen"
+        kinds = ", ".join(f"{count} {kind}" for kind, count in sorted(self.blocked.items(), key=lambda kv: -kv[1]))
+        return (f"blocked {blocked}/{total} requests ({kinds or 'none'}), "
+                f"~{self.bytes_saved / 1_000_000:.1f}MB saved (est.)")
@@ -0,0 +1,131 @@
+"""
+Row parser: turns the text of one SmartFind job row into a JobRow.
+
+A row's text is its cells joined by newlines, as the browser's innerText or
+json_feed.record_to_row_text gives it:
+
+    Details / Wednesday / 11/18/2026 / 7:45 AM / 2:45 PM / Teacher / EL CERRITO HIGH / Accept
+
+Button labels and weekday names are dropped. The first MM/DD/YYYY is the
+job date, the first and last clock times are the shift, and the last cell
+left over is the school.
+
+Every scan hands us mostly the same rows again, so results are memoized on
+the raw row text. A JobRow is shared between callers: treat it as read-only.
+
+    python bench_parser.py     # checks fixtures/rows.jsonl and reports rows/s
+"""
+import re
+
+from job_store import make_job_key
+
+DATE_RE = re.compile(r'\d{2}/\d{2}/\d{4}')
+TIME_RE = re.compile(r'\d{1,2}:\d{2}\s?[aApP][mM]')
+DIGIT_RE = re.compile(r'\d')
+
+BUTTON_LABELS = frozenset(["Decline", "Accept", "Details", "Select"])
+WEEKDAY_NAMES = frozenset(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"])
+
+CACHE_LIMIT = 4096
+
+_cache = {}
+
+
+class JobRow:
+    __slots__ = ("date", "school", "start", "end", "duration", "summary", "key")
+
+    def __init__(self, date, school, start, end, duration):
+        self.date = date
+        self.school = school
+        self.start = start
+        self.end = end
+        self.duration = duration
+
+        summary = f"📅 {date}"
+        if school:
+            summary += f" | 🏫 {school}"
+        if start and end:
+            summary += f" | ⏰ {start} - {end}"
+        elif start:
+            summary += f" | ⏰ {start}"
+        self.summary = summary
+        self.key = make_job_key(date, school, start, end)
+
+    def __repr__(self):
+        return f"JobRow({self.date!r}, {self.school!r}, {self.start!r}, {self.end!r}, {self.duration!r})"
+
+
+def clock_minutes(text):
+    """Minutes after midnight for "7:45 AM" / "7:45am", or None if it isn't a valid time."""
+    colon = text.find(":")
+    if colon < 1:
+        return None
+    try:
+        hour = int(text[:colon])
+        minute = int(text[colon + 1:colon + 3])
+    except ValueError:
+        return None
+    if not 1 <= hour <= 12 or not 0 <= minute <= 59:
+        return None
+    meridiem = text[-2:].upper()
+    if meridiem == "AM":
+        return (hour % 12) * 60 + minute
+    if meridiem == "PM":
+        return (hour % 12 + 12) * 60 + minute
+    return None
+
+
+def shift_hours(start, end):
+    """Length of a shift in hours, wrapping past midnight; 0.0 if either time is bad."""
+    first, last = clock_minutes(start), clock_minutes(end)
+    if first is None or last is None:
+        return 0.0
+    minutes = last - first
+    if minutes < 0:
+        minutes += 24 * 60
+    return minutes / 60.0
+
+
+def _parse(row_text):
+    items = []
+    for line in row_text.split("\n"):
+        line = line.strip()
+        if line and line not in BUTTON_LABELS:
+            items.append(line)
+    if not items:
+        return None
+    full_string = " ".join(items)
+    if not DIGIT_RE.search(full_string):
+        return None
+
+    date_match = DATE_RE.search(full_string)
+    date = date_match.group(0) if date_match else "Unknown"
+
+    times = TIME_RE.findall(full_string)
+    start = times[0].strip() if times else ""
+    end = times[-1].strip() if len(times) >= 2 else ""
+    duration = shift_hours(start, end) if end else 0.0
+
+    school = ""
+    for item in reversed(items):
+        if date in item or item in times or item in WEEKDAY_NAMES:
+            continue
+        school = item
+        break
+    return JobRow(date, school, start, end, duration)
+
+
+def parse_row(row_text):
+    """The JobRow for one row's text, or None if it isn't a job row. Memoized."""
+    row = _cache.get(row_text, False)
+    if row is not False:
+        return row
+    row = _parse(row_text)
+    if len(_cache) >= CACHE_LIMIT:
+        _cache.clear()
+    _cache[row_text] = row
+    return row
+
+
+def clear_cache():
+    _cache.clear()
@@ -0,0 +1,215 @@
+"""
+Job rules, loaded from a TOML file and compiled into a single matcher.
+
+Which schools we want, which days are off limits and which hour limits
+apply all live in rules.toml instead of code. The file is compiled once:
+every school pattern becomes one regex, blackout days and ranges become a
+set of date strings and skipped weekdays a bitmask, so deciding on a row
+is a couple of lookups and one regex search.
+
+When one scan turns up several jobs to accept, score() ranks them: the
+[priority] weights trade hours of work against school preference (the
+order of `targets`, first is best) and how many days out the job is.
+
+RuleEngine.maybe_reload() re-reads the file when it changes on disk. If the
+new file does not parse, the previous rules stay in force.
+"""
+import os
+import re
+from datetime import datetime, timedelta
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+ACCEPT = "accept"
+NOTIFY = "notify"
+IGNORE = "ignore"
+
+# Ignore reasons that depend on the calendar rather than on the job itself.
+# Jobs skipped for these aren't remembered, so they are looked at again on
+# the next scan (a cancelled job can free a date up).
+DATE_REASONS = ("blackout", "weekday")
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+DEFAULTS = {
+    "auto_accept": {"enabled": True, "min_hours": 4.5, "max_hours": 9.0, "require_24h_notice": True},
+    "notify": {"min_hours": 4.5, "only_dates": []},
+    "schools": {"targets": [], "combos": []},
+    "dates": {"blackout": [], "blackout_ranges": [], "skip_weekdays": []},
+    "priority": {"hours": 1.0, "school": 2.0, "days_out": -0.1},
+}
+
+_days = {}
+
+
+def job_day(job_date):
+    """Midnight of a MM/DD/YYYY date string, or None if it doesn't parse. Memoized."""
+    day = _days.get(job_date, False)
+    if day is not False:
+        return day
+    try:
+        month, date, year = job_date.split("/")
+        day = datetime(int(year), int(month), int(date))
+    except (AttributeError, ValueError):
+        day = None
+    if len(_days) > 4096:
+        _days.clear()
+    _days[job_date] = day
+    return day
+
+
+def _date_range(first, last):
+    day, last_day = job_day(first), job_day(last)
+    if day is None or last_day is None:
+        raise ValueError(f"bad blackout range {first!r}..{last!r}")
+    dates = set()
+    while day <= last_day:
+        dates.add(day.strftime("%m/%d/%Y"))
+        day += timedelta(days=1)
+    return dates
+
+
+def _school_pattern(targets, combos):
+    """One regex for every school name, plus a lookahead group per combo."""
+    alternatives = [re.escape(name.upper()) for name in sorted(targets, key=len, reverse=True)]
+    for words in combos:
+        lookaheads = "".join(f"(?=.*{re.escape(word.upper())})" for word in words)
+        alternatives.append(f"^{lookaheads}")
+    if not alternatives:
+        return re.compile(r"(?!)")  # no schools configured: nothing matches
+    return re.compile("|".join(alternatives), re.S)
+
+
+class Rules:
+    """One compiled rule set. Build a new one rather than changing this one."""
+
+    def __init__(self, config):
+        def section(name):
+            merged = dict(DEFAULTS[name])
+            merged.update(config.get(name, {}))
+            return merged
+
+        accept, notify, schools, dates, priority = (section(name) for name in DEFAULTS)
+        self.accept_enabled = bool(accept["enabled"])
+        self.accept_min = float(accept["min_hours"])
+        self.accept_max = float(accept["max_hours"])
+        self.require_24h = bool(accept["require_24h_notice"])
+        self.notify_min = float(notify["min_hours"])
+        self.notify_only = frozenset(notify["only_dates"])
+
+        self.schools = _school_pattern(schools["targets"], schools["combos"])
+        self.school_count = len(schools["targets"]) + len(schools["combos"])
+        # One pattern per school, in preference order, for score()
+        self.school_ranks = [_school_pattern([name], []) for name in schools["targets"]]
+        self.school_ranks += [_school_pattern([], [words]) for words in schools["combos"]]
+        self.hours_weight = float(priority["hours"])
+        self.school_weight = float(priority["school"])
+        self.days_out_weight = float(priority["days_out"])
+
+        blackout = set(dates["blackout"])
+        for first, last in dates["blackout_ranges"]:
+            blackout |= _date_range(first, last)
+        self.blackout = frozenset(blackout)
+        self.weekday_mask = 0
+        for name in dates["skip_weekdays"]:
+            self.weekday_mask |= 1 << WEEKDAYS.index(name.lower()[:3])
+
+    def decide(self, summary, job_date, duration, blocked=(), now=None):
+        """Returns (action, reason) for one job; action is ACCEPT, NOTIFY or IGNORE.
+
+        `blocked` holds extra dates to skip (days we already work) and `now`
+        is the current PST time, if the caller already has it.
+        """
+        if job_date in self.blackout or job_date in blocked:
+            return IGNORE, "blackout"
+        day = job_day(job_date)
+        if day is not None and self.weekday_mask >> day.weekday() & 1:
+            return IGNORE, "weekday"
+        if not self.schools.search(summary.upper()):
+            return IGNORE, "not a target school"
+        if duration > self.accept_max:
+            return IGNORE, "too long"
+
+        reason = "target school"
+        if not self.accept_enabled:
+            reason = "auto-accept off"
+        elif job_date in self.notify_only:
+            reason = "notify-only date"
+        elif duration < self.accept_min:
+            reason = "too short to accept"
+        elif self.require_24h and day is None:
+            reason = "unknown date"
+        elif self.require_24h:
+            now = now or datetime.utcnow() - timedelta(hours=8)
+            if (day - now).total_seconds() >= 86400:
+                return ACCEPT, "auto-accept"
+            reason = "under 24h notice"
+        else:
+            return ACCEPT, "auto-accept"
+
+        if duration >= self.notify_min:
+            return NOTIFY, reason
+        return IGNORE, "too short"
+
+    def is_target(self, summary):
+        """True if the job is at one of our schools, whatever else the rules say about it."""
+        return self.schools.search(summary.upper()) is not None
+
+    def score(self, summary, job_date, duration, now=None):
+        """How much we want this job compared with others we could accept. Higher is better."""
+        text = summary.upper()
+        preference = 0.0
+        for rank, pattern in enumerate(self.school_ranks):
+            if pattern.search(text):
+                preference = 1.0 - rank / len(self.school_ranks)
+                break
+        days_out = 0.0
+        day = job_day(job_date)
+        if day is not None:
+            now = now or datetime.utcnow() - timedelta(hours=8)
+            days_out = max((day - now).total_seconds() / 86400, 0.0)
+        return (self.hours_weight * duration + self.school_weight * preference
+                + self.days_out_weight * days_out)
+
+
+class RuleEngine:
+    """The current Rules for a file on disk, reloaded when the file changes."""
+
+    def __init__(self, path):
+        self.path = path
+        self.stamp = None
+        self.reloads = 0
+        self.rules = Rules({})
+        if not self.maybe_reload():
+            print(f"   ⚠️ No usable rules in {path}: no school will match until it is fixed.")
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def maybe_reload(self):
+        """Recompiles the rules if the file changed. True if new rules took effect."""
+        stamp = self._stamp()
+        if stamp is None or stamp == self.stamp:
+            return False
+        self.stamp = stamp
+        try:
+            with open(self.path, "rb") as f:
+                rules = Rules(tomllib.load(f))
+        except (OSError, tomllib.TOMLDecodeError, KeyError, TypeError, ValueError) as e:
+            print(f"   ⚠️ Could not load rules from {self.path}: {e} (keeping the previous rules)")
+            return False
+        self.rules = rules
+        self.reloads += 1
+        print(f"   📜 Rules loaded from {self.path}: {rules.school_count} school patterns, "
+              f"{len(rules.blackout)} blackout dates.")
+        return True
+
+    def decide(self, summary, job_date, duration, blocked=(), now=None):
+        return self.rules.decide(summary, job_date, duration, blocked, now)
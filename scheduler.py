@@ -0,0 +1,150 @@
+"""
+Adaptive poll scheduling.
+
+Instead of a flat sleep(60), the poll interval comes from time-of-day
+windows (PST, like the rest of the bot), optionally tightened or relaxed by
+a profile learned from when postings have historically shown up. Ticks are
+deadline-based, so a slow scan eats into the wait instead of pushing every
+later scan back, and a little jitter keeps us off exact multiples.
+
+Windows are written as a comma-separated list, first match wins:
+
+    "mon-fri 05:00-08:00=20, mon-fri 08:00-18:00=60, *=300"
+"""
+import random
+import time
+from datetime import datetime, timedelta
+
+DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def pst(epoch):
+    return datetime.utcfromtimestamp(epoch) - timedelta(hours=8)
+
+
+def _parse_days(spec):
+    if spec == "*":
+        return set(range(7))
+    days = set()
+    for part in spec.split("/"):
+        first, _, last = part.partition("-")
+        start = DAYS.index(first)
+        end = DAYS.index(last) if last else start
+        day = start
+        while True:
+            days.add(day)
+            if day == end:
+                break
+            day = (day + 1) % 7
+    return days
+
+
+def _parse_clock(text):
+    hours, minutes = text.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def parse_windows(spec):
+    """Turns the POLL_WINDOWS string into [(days, start_minute, end_minute, seconds)]."""
+    windows = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        when, _, seconds = entry.rpartition("=")
+        parts = when.split()
+        days = _parse_days(parts[0].lower() if parts else "*")
+        start, end = 0, 24 * 60
+        if len(parts) > 1:
+            first, last = parts[1].split("-")
+            start, end = _parse_clock(first), _parse_clock(last)
+        windows.append((days, start, end, float(seconds)))
+    return windows
+
+
+class PostingProfile:
+    """How busy each (weekday, hour) slot has been, learned from posting times.
+
+    factor() is below 1 for slots busier than average (poll faster) and
+    above 1 for quiet ones, clamped to [min_factor, max_factor].
+    """
+
+    def __init__(self, timestamps, min_samples=50, min_factor=0.5, max_factor=2.0):
+        counts = [[0] * 24 for _ in range(7)]
+        total = 0
+        for ts in timestamps:
+            when = pst(ts)
+            counts[when.weekday()][when.hour] += 1
+            total += 1
+        self.total = total
+        self.enabled = total >= min_samples
+        mean = total / (7 * 24)
+        self.factors = [
+            [min(max((mean + 1) / (count + 1), min_factor), max_factor) for count in day]
+            for day in counts
+        ]
+
+    def factor(self, when):
+        if not self.enabled:
+            return 1.0
+        return self.factors[when.weekday()][when.hour]
+
+
+class PollScheduler:
+    def __init__(self, windows, default_interval=60.0, jitter=0.15, scale=1.0,
+                 min_interval=5.0, profile_source=None, profile_refresh=86400, rng=None):
+        self.windows = windows
+        self.default_interval = default_interval
+        self.jitter = jitter
+        self.scale = scale
+        self.min_interval = min_interval
+        self.profile_source = profile_source
+        self.profile_refresh = profile_refresh
+        self.profile = None
+        self.profile_built_at = 0.0
+        self.random = rng or random.Random()
+        self.deadline = None
+        self.overruns = 0
+
+    def _window_interval(self, when):
+        minute = when.hour * 60 + when.minute
+        for days, start, end, seconds in self.windows:
+            if when.weekday() in days and start <= minute < end:
+                return seconds
+        return self.default_interval
+
+    def _refresh_profile(self, now):
+        if self.profile_source is None or now - self.profile_built_at < self.profile_refresh:
+            return
+        self.profile_built_at = now
+        try:
+            self.profile = PostingProfile(self.profile_source())
+        except Exception as e:
+            print(f"   ⚠️ Could not build posting profile: {e}")
+
+    def interval_at(self, epoch):
+        """Target seconds between scan starts at this moment, before jitter."""
+        when = pst(epoch)
+        interval = self._window_interval(when) * self.scale
+        if self.profile is not None:
+            interval *= self.profile.factor(when)
+        return max(interval, self.min_interval)
+
+    def start(self, now=None):
+        """Anchors the first deadline. Call just before the first scan."""
+        self.deadline = now or time.time()
+
+    def next_delay(self, now=None):
+        """Seconds to wait before the next scan. Call right after each scan."""
+        now = now or time.time()
+        self._refresh_profile(now)
+        if self.deadline is None:
+            self.deadline = now
+        interval = self.interval_at(self.deadline)
+        interval *= 1 + self.random.uniform(-self.jitter, self.jitter)
+        self.deadline += interval
+        if self.deadline < now:
+            # The scan ran past its slot; start again from now rather than bursting
+            self.overruns += 1
+            self.deadline = now
+        return self.deadline - now
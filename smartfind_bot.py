@@ -12,6 +12,7 @@ SF_USERNAME = os.getenv("SF_USERNAME")
 SF_PASSWORD = os.getenv("SF_PASSWORD")
 PUSHOVER_USER = os.getenv("PUSHOVER_USER")
 PUSHOVER_TOKEN = os.getenv("PUSHOVER_TOKEN")
+BASE_URL = os.getenv("SF_BASE_URL", "https://westcontracosta.eschoolsolutions.com")
 
 def send_push(message):
     try:
@@ -39,7 +40,7 @@ def run_bot():
         # --- LOGIN ---
         try:
             print("🌐 Logging in...")
-            page.goto("https://westcontracosta.eschoolsolutions.com/logOnInitAction.do")
+            page.goto(f"{BASE_URL}/logOnInitAction.do")
             
             frame = page.frames[0]
             frame.locator("#userId").wait_for(state="visible", timeout=10000)
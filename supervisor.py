@@ -0,0 +1,147 @@
+"""
+Hard deadlines for scan stages, and a supervisor for when they don't hold.
+
+Playwright's own timeouts only cover the call they are passed to. A
+networkidle that never settles or a wedged renderer can still stall a scan
+for hours. Every stage of a scan therefore runs under a hard deadline:
+
+    await SUPERVISOR.within("available", goto_authenticated(...))
+
+A stage that runs over is cancelled and raises StageTimeout. The scan is
+counted as missed and the bot throws the browser away and starts a fresh
+one on the next scan, so a stall costs one scan. After
+`restart_process_after` missed scans in a row, or if a scan is still
+running `hang_seconds` after it started (the event loop itself is stuck,
+or something swallowed the cancellation), a watchdog thread kills the
+browser processes and restarts the whole bot in place with os.execv.
+
+Deadlines are written like poll windows, comma separated:
+
+    "launch=60, login=30, active=45, available=75, accept=120, scan=300, close=20"
+"""
+import asyncio
+import os
+import signal
+import sys
+import threading
+import time
+
+from memory_watchdog import child_pids
+
+RESTARTS_ENV = "SUPERVISOR_RESTARTS"  # how many times this bot restarted itself
+
+
+class StageTimeout(Exception):
+    def __init__(self, stage, seconds):
+        super().__init__(f"{stage} took longer than {seconds:g}s")
+        self.stage = stage
+        self.seconds = seconds
+
+
+def parse_deadlines(spec):
+    """Turns the STAGE_DEADLINES string into {stage: seconds}."""
+    deadlines = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        stage, _, seconds = entry.partition("=")
+        deadlines[stage.strip()] = float(seconds)
+    return deadlines
+
+
+def kill_children():
+    """SIGKILLs every process we spawned (the Playwright driver and Chromium)."""
+    killed = 0
+    for pid in child_pids(os.getpid()):
+        try:
+            os.kill(pid, signal.SIGKILL)
+            killed += 1
+        except OSError:
+            pass
+    return killed
+
+
+class Supervisor:
+    def __init__(self, deadlines, restart_process_after=3, hang_seconds=0):
+        self.deadlines = deadlines
+        self.restart_process_after = restart_process_after
+        # By default a scan may take twice its own deadline before we give up on the process
+        self.hang_seconds = hang_seconds or 2 * deadlines.get("scan", 0)
+
+        self.timeouts = {}  # stage -> deadlines missed
+        self.missed_scans = 0
+        self.missed_in_a_row = 0
+        self.browser_restarts = 0
+        self.process_restarts = int(os.getenv(RESTARTS_ENV, "0"))
+        self.scan_started_at = 0.0
+        self.scan_name = None
+        self.thread = None
+
+    # ==========================================
+    # ⏰ DEADLINES
+    # ==========================================
+    async def within(self, stage, awaitable):
+        """Awaits `awaitable`, raising StageTimeout if it runs past the stage's deadline."""
+        seconds = self.deadlines.get(stage)
+        if not seconds:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, seconds)
+        except asyncio.TimeoutError:
+            self.timeouts[stage] = self.timeouts.get(stage, 0) + 1
+            raise StageTimeout(stage, seconds) from None
+
+    def scan_started(self, name):
+        self.scan_name = name
+        self.scan_started_at = time.time()
+
+    def scan_finished(self, missed=False):
+        """Records how a scan went. Returns True once the process should restart."""
+        self.scan_started_at = 0.0
+        if not missed:
+            self.missed_in_a_row = 0
+            return False
+        self.missed_scans += 1
+        self.missed_in_a_row += 1
+        return bool(self.restart_process_after) and self.missed_in_a_row >= self.restart_process_after
+
+    # ==========================================
+    # 🐕 PROCESS WATCHDOG
+    # ==========================================
+    def start(self):
+        """Starts the thread that restarts the process if a scan hangs past hang_seconds."""
+        if not self.hang_seconds or self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._watch, name="supervisor", daemon=True)
+        self.thread.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(1.0)
+            started = self.scan_started_at
+            if started and time.time() - started > self.hang_seconds:
+                self.restart_process(f"{self.scan_name} scan stuck for {time.time() - started:.0f}s")
+
+    def restart_process(self, reason):
+        """Kills the browser and re-executes the bot from scratch. Does not return."""
+        print(f"🔁 SUPERVISOR: restarting the bot ({reason}). "
+              f"{self.missed_scans} scans missed so far.", flush=True)
+        kill_children()
+        os.environ[RESTARTS_ENV] = str(self.process_restarts + 1)
+        try:
+            sys.stdout.flush()
+            os.execv(sys.executable, [sys.executable] + sys.argv)
+        finally:
+            os._exit(3)  # exec failed; let the container's restart policy take over
+
+    def stats(self):
+        stats = {
+            "missed_scans": self.missed_scans,
+            "missed_in_a_row": self.missed_in_a_row,
+            "browser_restarts": self.browser_restarts,
+            "process_restarts": self.process_restarts,
+        }
+        for stage, count in self.timeouts.items():
+            stats[f"timeouts_{stage}"] = count
+        return stats